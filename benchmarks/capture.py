@@ -0,0 +1,130 @@
+"""
+Cost of turning a captured BGRX bitmap into a frame at 720p-2160p
+
+Compares the previous conversion (PIL image -> NumPy copy -> RGB to BGR -> grayscale) with
+wrapping the bitmap bytes as a NumPy view and converting once, optionally straight to grayscale,
+into pooled buffers and cropped to the queue panel before conversion. The bitmap is built from
+the seed frame, so no window or screen is needed. Besides latency and peak memory, reports how
+many image buffers each path writes, how many of them are new allocations, and how many bytes
+and pixels end up in the frame.
+
+Run from the repository root:
+    python -m benchmarks.capture [--runs N] [--output benchmark_capture.json]
+"""
+import argparse
+import cv2
+import numpy as np
+from PIL import Image
+from benchmarks.harness import measure, environment, write_report, print_table
+from benchmarks.pipeline import RESOLUTIONS
+from screen_capture import FrameBufferPool, bitmap_view, convert_frame
+
+# Queue panel share of the frame (left, top, width, height) for the cropped path
+PANEL = (0.4, 0.42, 0.25, 0.06)
+
+
+def legacy_path(bits, width, height, pool, region, written):
+    # PIL also decodes into a buffer of its own, which is not counted
+    image = Image.frombuffer("RGB", (width, height), bits, "raw", "BGRX", 0, 1)
+    written.append(np.array(image))
+    written.append(cv2.cvtColor(written[-1], cv2.COLOR_RGB2BGR))
+    written.append(cv2.cvtColor(written[-1], cv2.COLOR_BGR2GRAY))
+    return written[-1]
+
+
+def view_bgr_path(bits, width, height, pool, region, written):
+    written.append(convert_frame(bitmap_view(bits, width, height), cv2.COLOR_BGRA2BGR))
+    return written[-1]
+
+
+def view_bgr_pooled_path(bits, width, height, pool, region, written):
+    written.append(convert_frame(bitmap_view(bits, width, height), cv2.COLOR_BGRA2BGR, pool))
+    return written[-1]
+
+
+def view_gray_pooled_path(bits, width, height, pool, region, written):
+    written.append(convert_frame(bitmap_view(bits, width, height), cv2.COLOR_BGRA2GRAY, pool))
+    return written[-1]
+
+
+def view_gray_panel_path(bits, width, height, pool, region, written):
+    left, top, panel_width, panel_height = region
+    view = bitmap_view(bits, width, height)[top:top + panel_height, left:left + panel_width]
+    written.append(convert_frame(view, cv2.COLOR_BGRA2GRAY, pool))
+    return written[-1]
+
+
+PATHS = {
+    "legacy": legacy_path,
+    "view_bgr": view_bgr_path,
+    "view_bgr_pooled": view_bgr_pooled_path,
+    "view_gray_pooled": view_gray_pooled_path,
+    "view_gray_panel": view_gray_panel_path,
+}
+
+
+def run_path(path, bits, width, height, pool, region):
+    """
+    One capture through path, handing its frame back to the pool as the monitor does
+    """
+    written = []
+    path(bits, width, height, pool, region, written)
+    for image in written:
+        pool.release(image)
+
+
+def run(args):
+    seed = cv2.imread(args.seed)
+    if seed is None:
+        raise SystemExit(f"Could not read seed frame: {args.seed}")
+
+    results = {}
+    rows = []
+    for name, (width, height) in RESOLUTIONS.items():
+        frame = cv2.resize(seed, (width, height), interpolation=cv2.INTER_AREA)
+        bits = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA).tobytes()
+        region = (int(width * PANEL[0]), int(height * PANEL[1]), int(width * PANEL[2]), int(height * PANEL[3]))
+        results[name] = {"size": [width, height], "paths": {}}
+
+        for path_name, path in PATHS.items():
+            pool = FrameBufferPool(2)
+            summary, _ = measure(run_path, [(path, bits, width, height, pool, region)], args.runs)
+
+            written = []
+            path(bits, width, height, pool, region, written)
+            summary["buffers_written"] = len(written)
+            summary["buffers_allocated"] = sum(1 for image in written if id(image) not in pool.leased)
+            summary["bytes_written"] = sum(image.nbytes for image in written)
+            summary["pixels"] = written[-1].shape[0] * written[-1].shape[1]
+            for image in written:
+                pool.release(image)
+            del written
+
+            results[name]["paths"][path_name] = summary
+            rows.append((f"{name} {path_name}", summary))
+
+    print_table(rows)
+    print()
+    print(f"{'path':40s} {'buffers':>10s} {'allocated':>10s} {'MB written':>10s} {'pixels':>10s}")
+    for name, result in results.items():
+        for path_name, summary in result["paths"].items():
+            print(f"{name + ' ' + path_name:40s} {summary['buffers_written']:10d} {summary['buffers_allocated']:10d} "
+                  f"{summary['bytes_written'] / 1024 / 1024:10.1f} {summary['pixels']:10d}")
+
+    report = {"benchmark": "capture", "environment": environment(), "results": results}
+    if args.output:
+        write_report(args.output, report)
+        print(f"Report written to {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark captured bitmap to frame conversion")
+    parser.add_argument("--seed", default="test_capture.png", help="Frame the bitmaps are built from")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", default="benchmark_capture.json")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Shared helpers for the benchmarks: timing, percentiles, peak memory and JSON reports
+"""
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+def percentile(sorted_values, share):
+    """
+    Percentile of already sorted values with linear interpolation (share in 0-1)
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * share
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(durations_ms, peak_memory=None):
+    """
+    Summary statistics for a list of durations in milliseconds
+    """
+    values = sorted(durations_ms)
+    total_seconds = sum(values) / 1000
+    return {
+        "runs": len(values),
+        "mean_ms": sum(values) / len(values) if values else 0.0,
+        "p50_ms": percentile(values, 0.50),
+        "p95_ms": percentile(values, 0.95),
+        "p99_ms": percentile(values, 0.99),
+        "max_ms": values[-1] if values else 0.0,
+        "throughput_per_s": len(values) / total_seconds if total_seconds else 0.0,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def measure(function, args_list, runs, warmup=1, track_memory=True):
+    """
+    Call function(*args) for each args in args_list, runs times over the list
+    Returns: (summary dict, last result)
+    """
+    result = None
+    for args in args_list[:warmup]:
+        result = function(*args)
+
+    durations = []
+    for _ in range(runs):
+        for args in args_list:
+            start = time.perf_counter()
+            result = function(*args)
+            durations.append((time.perf_counter() - start) * 1000)
+
+    # Peak memory is measured in a separate pass - tracing slows the calls down
+    peak_memory = None
+    if track_memory:
+        tracemalloc.start()
+        for args in args_list:
+            tracemalloc.reset_peak()
+            function(*args)
+            peak_memory = max(peak_memory or 0, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return summarize(durations, peak_memory), result
+
+
+def git_commit():
+    """
+    Current git commit hash, or None outside a git checkout
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def environment():
+    """
+    Describe where the benchmark ran, so reports from different machines are not mixed up
+    """
+    return {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_report(path, report):
+    """
+    Write report as JSON
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+
+
+def print_table(rows):
+    """
+    Print (label, summary) rows as an aligned table
+    """
+    print(f"{'stage':40s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s} {'per s':>10s} {'peak MB':>10s}")
+    for label, summary in rows:
+        peak = summary.get("peak_memory_bytes")
+        peak_text = f"{peak / 1024 / 1024:10.1f}" if peak is not None else f"{'-':>10s}"
+        print(f"{label:40s} {summary['p50_ms']:10.2f} {summary['p95_ms']:10.2f} {summary['p99_ms']:10.2f} "
+              f"{summary['throughput_per_s']:10.1f} {peak_text}")
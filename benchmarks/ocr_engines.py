@@ -0,0 +1,38 @@
+"""
+Compare OCR engines on test_processed.png
+
+Run from the repository root:
+    python -m benchmarks.ocr_engines [--runs N]
+"""
+import argparse
+import cv2
+from benchmarks.harness import measure, print_table
+from ocr_processor import PytesseractEngine, TesserocrEngine, tesserocr_available
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR engines on a processed frame")
+    parser.add_argument("--image", default="test_processed.png")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    image = cv2.imread(args.image, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise SystemExit(f"Could not read image: {args.image}")
+
+    engines = [PytesseractEngine()]
+    if tesserocr_available:
+        engines.append(TesserocrEngine())
+    else:
+        print("tesserocr not installed - only the pytesseract engine is measured")
+
+    rows = []
+    for engine in engines:
+        summary, _ = measure(engine.image_to_string, [(image,)], args.runs, track_memory=False)
+        rows.append((engine.name, summary))
+        engine.close()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
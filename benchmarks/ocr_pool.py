@@ -0,0 +1,114 @@
+"""
+OCR throughput with worker threads vs worker processes
+
+Submits frames from as many threads as there are workers, as the capture pipeline does,
+and reports frames per second for 1..N workers in each execution mode.
+
+Run from the repository root:
+    python -m benchmarks.ocr_pool [--max-workers N] [--frames N] [--preprocess-only]
+"""
+import argparse
+import threading
+import time
+import cv2
+from benchmarks.harness import summarize, environment, write_report, print_table
+from ocr_pool import ProcessOcrExecutor
+from ocr_processor import create_queue_cascade
+from roi import QueueRegionLocator
+from digit_recognizer import DigitRecognizer
+from preprocessing import default_preprocessor
+
+
+def run_concurrently(function, frame, frames, workers):
+    """
+    Call function(frame) frames times from workers threads
+    Returns: (list of per-frame durations in ms, wall time in seconds)
+    """
+    durations = []
+    lock = threading.Lock()
+    remaining = [frames]
+
+    def submit():
+        while True:
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            function(frame)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with lock:
+                durations.append(elapsed_ms)
+
+    threads = [threading.Thread(target=submit) for _ in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return durations, time.perf_counter() - start
+
+
+def measure_mode(function, frame, frames, workers):
+    function(frame)  # Warm up (worker start, engine initialization)
+    durations, wall_seconds = run_concurrently(function, frame, frames, workers)
+    summary = summarize(durations)
+    # Concurrent calls overlap - throughput is frames over wall time, not over summed durations
+    summary["throughput_per_s"] = frames / wall_seconds if wall_seconds else 0.0
+    return summary
+
+
+def run(args):
+    frame = cv2.imread(args.seed)
+    if frame is None:
+        raise SystemExit(f"Could not read seed frame: {args.seed}")
+    screen_size = (frame.shape[1], frame.shape[0])
+
+    if args.preprocess_only:
+        thread_function = default_preprocessor.run
+    else:
+        # In memory only - the benchmark must not overwrite the user's region cache and digit templates
+        cascade = create_queue_cascade(QueueRegionLocator(cache_path=None), DigitRecognizer(templates_path=None))
+        thread_function = lambda image: cascade.run(image, screen_size)
+
+    results = {}
+    rows = []
+    for workers in range(1, args.max_workers + 1):
+        summary = measure_mode(thread_function, frame, args.frames, workers)
+        results[f"thread x{workers}"] = summary
+        rows.append((f"thread x{workers}", summary))
+
+        executor = ProcessOcrExecutor(workers)
+        try:
+            summary = measure_mode(
+                lambda image: executor.run(image, screen_size, preprocess_only=args.preprocess_only),
+                frame, args.frames, workers
+            )
+        finally:
+            executor.close()
+        results[f"process x{workers}"] = summary
+        rows.append((f"process x{workers}", summary))
+
+    print_table(rows)
+
+    report = {"benchmark": "ocr_pool", "environment": environment(),
+              "preprocess_only": args.preprocess_only, "results": results}
+    if args.output:
+        write_report(args.output, report)
+        print(f"Report written to {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR throughput in worker threads and processes")
+    parser.add_argument("--seed", default="test_capture.png", help="Frame to OCR")
+    parser.add_argument("--frames", type=int, default=20, help="Frames per measurement")
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument("--preprocess-only", action="store_true",
+                        help="Only preprocess frames (for machines without Tesseract)")
+    parser.add_argument("--output", default="benchmark_ocr_pool.json")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Per-stage benchmark of the capture -> preprocess -> OCR -> parse pipeline
+
+Builds a corpus by scaling test_capture.png to several resolutions and replays it through
+the replay capture backend. Results are printed and written as JSON, so they can be
+compared across commits.
+
+Run from the repository root:
+    python -m benchmarks.pipeline [--runs N] [--output benchmark_pipeline.json] [--skip-ocr]
+"""
+import argparse
+import os
+import tempfile
+import cv2
+from benchmarks.harness import measure, environment, write_report, print_table
+from capture_backends import ReplayBackend
+from screen_capture import preprocess_image
+from ocr_processor import extract_text, analyze_queue_status, get_ocr_engine
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "2160p": (3840, 2160),
+}
+
+
+def build_corpus(seed_path, directory):
+    """
+    Write the seed frame scaled to each resolution into directory
+    Returns: dict of resolution name -> (frame path, frame)
+    """
+    seed = cv2.imread(seed_path)
+    if seed is None:
+        raise SystemExit(f"Could not read seed frame: {seed_path}")
+
+    corpus = {}
+    for name, size in RESOLUTIONS.items():
+        frame = cv2.resize(seed, size, interpolation=cv2.INTER_AREA)
+        frame_dir = os.path.join(directory, name)
+        os.makedirs(frame_dir, exist_ok=True)
+        path = os.path.join(frame_dir, "frame.png")
+        cv2.imwrite(path, frame)
+        corpus[name] = (frame_dir, frame)
+    return corpus
+
+
+def ocr_available():
+    """
+    Check that the OCR engine can run (Tesseract installed)
+    """
+    try:
+        get_ocr_engine().image_to_string(cv2.imread("test_processed.png", cv2.IMREAD_GRAYSCALE)[:64, :64])
+        return True
+    except Exception as e:
+        print(f"OCR not available, skipping OCR stage: {e}")
+        return False
+
+
+def run(args):
+    with open(args.text, "r", encoding="utf-8") as f:
+        seed_text = f.read()
+
+    run_ocr = not args.skip_ocr and ocr_available()
+    results = {}
+    rows = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = build_corpus(args.seed, directory)
+
+        for name, (frame_dir, frame) in corpus.items():
+            backend = ReplayBackend(frame_dir, fps=0, loop=True)
+            stages = {}
+
+            stages["capture"], _ = measure(backend.capture, [()], args.runs)
+            stages["preprocess_image"], processed = measure(preprocess_image, [(frame,)], args.runs)
+            if run_ocr:
+                stages["extract_text"], _ = measure(extract_text, [(processed,)], args.ocr_runs, track_memory=False)
+            stages["analyze_queue_status"], _ = measure(analyze_queue_status, [(seed_text,)], args.runs * 10)
+
+            backend.close()
+            results[name] = {"size": list(RESOLUTIONS[name]), "stages": stages}
+            rows.extend((f"{name} {stage}", summary) for stage, summary in stages.items())
+
+    print_table(rows)
+
+    report = {"benchmark": "pipeline", "environment": environment(), "results": results}
+    if args.output:
+        write_report(args.output, report)
+        print(f"Report written to {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the queue monitoring pipeline per stage")
+    parser.add_argument("--seed", default="test_capture.png", help="Frame to build the corpus from")
+    parser.add_argument("--text", default="test_text.txt", help="OCR text for the parse stage")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--ocr-runs", type=int, default=3, help="Runs for the (slow) OCR stage")
+    parser.add_argument("--skip-ocr", action="store_true")
+    parser.add_argument("--output", default="benchmark_pipeline.json")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
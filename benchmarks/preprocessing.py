@@ -0,0 +1,129 @@
+"""
+Speed and OCR accuracy of the preprocessing variants at 720p-2160p
+
+Draws queue text ("Position: P / T", light grey like the game's) with known numbers onto the
+seed frame scaled to each resolution, runs every preprocessing variant on those frames (the panel
+variants on the queue panel crop only, color keyed or not) and, when Tesseract is available,
+checks whether the queue status read from the result matches.
+The seed frame is a busy desktop screenshot, which is what makes a global threshold fail.
+
+Run from the repository root:
+    python -m benchmarks.preprocessing [--runs N] [--output benchmark_preprocessing.json] [--skip-ocr]
+"""
+import argparse
+import cv2
+import numpy as np
+from benchmarks.harness import measure, environment, write_report, print_table
+from benchmarks.pipeline import RESOLUTIONS, ocr_available
+from ocr_processor import extract_text, analyze_queue_status
+from preprocessing import Preprocessor, default_preprocessor, adaptive_preprocessor
+
+QUEUE_NUMBERS = [(1, 1), (7, 42), (23, 108), (156, 310)]
+TEXT_COLOR = (225, 225, 225)
+# Share of the frame (left, top, width, height) around the queue text, cropped for the panel variants
+PANEL = (0.38, 0.4, 0.35, 0.08)
+
+
+def legacy_preprocess(image):
+    """
+    The previous preprocessing: grayscale, global Otsu threshold and a 1x1 opening (new arrays each call)
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return cv2.morphologyEx(binary, cv2.MORPH_OPEN, np.ones((1, 1), np.uint8)), 1.0
+
+
+def panel_variant(preprocessor):
+    """
+    Preprocess the queue panel crop of the frame, as the digits and region stages do
+    """
+    def preprocess(frame):
+        height, width = frame.shape[:2]
+        left, top = int(width * PANEL[0]), int(height * PANEL[1])
+        panel = frame[top:top + int(height * PANEL[3]), left:left + int(width * PANEL[2])]
+        return preprocessor.run(panel, height)
+    return preprocess
+
+
+VARIANTS = {
+    "legacy": legacy_preprocess,
+    "profile": default_preprocessor.run,
+    "adaptive": adaptive_preprocessor.run,
+    "panel": panel_variant(default_preprocessor),
+    "panel_no_color_key": panel_variant(Preprocessor(color_key=False)),
+}
+
+
+def build_frames(seed, size):
+    """
+    Seed frame scaled to size with queue text drawn on it
+    Returns: list of (frame, (position, total))
+    """
+    background = cv2.resize(seed, size, interpolation=cv2.INTER_AREA)
+    font_scale = size[1] / 720
+    frames = []
+    for position, total in QUEUE_NUMBERS:
+        frame = background.copy()
+        origin = (int(size[0] * 0.4), int(size[1] * 0.45))
+        cv2.putText(frame, f"Position: {position} / {total}", origin, cv2.FONT_HERSHEY_SIMPLEX,
+                    font_scale, TEXT_COLOR, max(1, round(2 * font_scale)), cv2.LINE_AA)
+        frames.append((frame, (position, total)))
+    return frames
+
+
+def accuracy(preprocess, frames):
+    """
+    Share of frames whose queue position and total are read correctly
+    """
+    correct = 0
+    for frame, (position, total) in frames:
+        processed, _ = preprocess(frame)
+        status = analyze_queue_status(extract_text(processed))
+        correct += status == (True, position, total)
+    return correct / len(frames)
+
+
+def run(args):
+    seed = cv2.imread(args.seed)
+    if seed is None:
+        raise SystemExit(f"Could not read seed frame: {args.seed}")
+
+    run_ocr = not args.skip_ocr and ocr_available()
+    results = {}
+    rows = []
+    for name, size in RESOLUTIONS.items():
+        frames = build_frames(seed, size)
+        args_list = [(frame,) for frame, _ in frames]
+        results[name] = {"size": list(size), "variants": {}}
+        for variant, preprocess in VARIANTS.items():
+            summary, _ = measure(preprocess, args_list, args.runs)
+            if run_ocr:
+                summary["accuracy"] = accuracy(preprocess, frames)
+            results[name]["variants"][variant] = summary
+            rows.append((f"{name} {variant}", summary))
+
+    print_table(rows)
+    if run_ocr:
+        print()
+        for name, result in results.items():
+            line = ", ".join(f"{variant} {summary['accuracy']:.0%}" for variant, summary in result["variants"].items())
+            print(f"{name} accuracy: {line}")
+
+    report = {"benchmark": "preprocessing", "environment": environment(), "results": results}
+    if args.output:
+        write_report(args.output, report)
+        print(f"Report written to {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing speed and OCR accuracy")
+    parser.add_argument("--seed", default="test_capture.png", help="Background frame for the corpus")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--skip-ocr", action="store_true", help="Only measure speed")
+    parser.add_argument("--output", default="benchmark_preprocessing.json")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
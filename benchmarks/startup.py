@@ -0,0 +1,148 @@
+"""
+Startup cost: import time of the UI and the monitoring core, and time to first paint
+
+Each measurement runs in a fresh interpreter, so nothing is cached in sys.modules:
+- `python -X importtime -c "import <module>"` gives the cumulative import time of ui (what the
+  window waits for) and monitor_engine (loaded in the background), the slowest imports, and
+  whether heavy modules (OpenCV, NumPy, PIL, OCR, Win32, psutil) leak into the UI's import tree;
+- a child process creates the window as main.py does and reports when it was first drawn and
+  when the monitoring engine finished loading behind it.
+Time to first paint is compared against --budget-ms. Needs a display for the paint measurement;
+the import measurement runs anywhere.
+
+Run from the repository root:
+    python -m benchmarks.startup [--runs N] [--budget-ms 500] [--output benchmark_startup.json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from benchmarks.harness import summarize, environment, write_report, print_table
+
+HEAVY_MODULES = ["cv2", "numpy", "PIL", "pytesseract", "tesserocr", "psutil", "pyautogui", "mss",
+                 "win32gui", "win32ui", "win32process", "win10toast"]
+
+# Runs in the child process; prints one JSON line
+PAINT_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import tkinter as tk
+from ui import SquadQueueMonitorUI
+imported = time.perf_counter()
+root = tk.Tk()
+app = SquadQueueMonitorUI(root)
+root.update()
+painted = time.perf_counter()
+while not app.engine_ready.is_set() and time.perf_counter() - painted < 30:
+    root.update()
+    time.sleep(0.01)
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_paint_ms": (painted - start) * 1000,
+    "engine_ready_ms": (ready - start) * 1000 if app.engine_ready.is_set() else None,
+}))
+root.destroy()
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output
+    Returns: {module: (self us, cumulative us)} for the top-level import of each module
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return modules
+
+
+def import_profile(module, runs):
+    """
+    Import module in fresh interpreters
+    Returns: (summary of cumulative import ms, slowest modules of the last run, heavy modules imported)
+    """
+    durations = []
+    modules = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+        modules = parse_importtime(result.stderr)
+        durations.append(modules[module][1] / 1000)
+
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    heavy = [name for name in HEAVY_MODULES if name in modules]
+    return summarize(durations), [(name, self_us / 1000) for name, (self_us, _) in slowest], heavy
+
+
+def paint_profile(runs):
+    """
+    Create the window in fresh interpreters
+    Returns: list of per-run timings, or None without a display
+    """
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", PAINT_SCRIPT], capture_output=True, text=True)
+        if result.returncode != 0:
+            if "TclError" in result.stderr:
+                return None
+            raise SystemExit(f"Window startup failed:\n{result.stderr[-2000:]}")
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def run(args):
+    results = {"imports": {}}
+    rows = []
+    for module in ("ui", "monitor_engine"):
+        summary, slowest, heavy = import_profile(module, args.runs)
+        results["imports"][module] = {"summary": summary, "slowest": slowest, "heavy_modules": heavy}
+        rows.append((f"import {module}", summary))
+
+    samples = None if args.skip_paint else paint_profile(args.runs)
+    if samples:
+        for key in ("first_paint_ms", "engine_ready_ms"):
+            values = [sample[key] for sample in samples if sample[key] is not None]
+            if values:
+                results[key] = summarize(values)
+                rows.append((key[:-3].replace("_", " "), results[key]))
+
+    print_table(rows)
+    print()
+    for module, result in results["imports"].items():
+        slowest = ", ".join(f"{name} {ms:.1f}" for name, ms in result["slowest"][:5])
+        print(f"{module}: slowest imports (self ms): {slowest}")
+        print(f"{module}: heavy modules imported: {', '.join(result['heavy_modules']) or 'none'}")
+
+    results["budget_ms"] = args.budget_ms
+    if "first_paint_ms" in results:
+        first_paint = results["first_paint_ms"]["p50_ms"]
+        results["within_budget"] = first_paint <= args.budget_ms
+        print(f"Time to first paint {first_paint:.0f} ms (p50), budget {args.budget_ms:.0f} ms: "
+              f"{'ok' if results['within_budget'] else 'over budget'}")
+    else:
+        print("Time to first paint not measured (no display or --skip-paint)")
+
+    report = {"benchmark": "startup", "environment": environment(), "results": results}
+    if args.output:
+        write_report(args.output, report)
+        print(f"Report written to {args.output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startup import time and time to first paint")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=500, help="Target time to first paint")
+    parser.add_argument("--skip-paint", action="store_true", help="Only measure import time")
+    parser.add_argument("--output", default="benchmark_startup.json")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
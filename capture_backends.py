@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+import cv2
+from config import CAPTURE_BACKEND, REPLAY_SOURCE, REPLAY_FPS, REPLAY_LOOP, CAPTURE_GRAYSCALE, CAPTURE_POOL_SIZE
+from screen_capture import GameLocator, FrameBufferPool, capture_window, capture_full_screen
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+
+class CaptureBackend:
+    """
+    Base class for frame sources
+    """
+    name = "base"
+
+    def __init__(self, gray=CAPTURE_GRAYSCALE):
+        self.gray = gray
+        # Frames are converted into reused buffers instead of new arrays
+        self.pool = FrameBufferPool(CAPTURE_POOL_SIZE)
+
+    def capture(self, window_title=None, region=None):
+        """
+        Capture a frame
+        region: (left, top, width, height) of the frame to grab instead of the whole frame
+        (e.g. the located queue panel)
+        Returns: BGR (or grayscale, see gray) image (numpy array) or None if nothing could be captured;
+        pass the image to release() once it is no longer needed
+        """
+        raise NotImplementedError
+
+    def release(self, image):
+        """
+        Return a captured frame's buffer for reuse
+        """
+        self.pool.release(image)
+
+    def close(self):
+        """
+        Release backend resources
+        """
+        pass
+
+
+class WindowBackend(CaptureBackend):
+    """
+    Captures the game window through Win32 PrintWindow
+    """
+    name = "window"
+
+    def __init__(self, locator=None, gray=CAPTURE_GRAYSCALE):
+        super().__init__(gray)
+        self.locator = locator or GameLocator()
+
+    def capture(self, window_title=None, region=None):
+        return capture_window(window_title, self.locator, self.gray, self.pool, region)
+
+
+class ScreenBackend(CaptureBackend):
+    """
+    Captures one monitor (SCREEN_CAPTURE_MONITOR) through mss, or the primary one through pyautogui
+    """
+    name = "screen"
+
+    def capture(self, window_title=None, region=None):
+        return capture_full_screen(self.gray, self.pool, region)
+
+
+class AutoBackend(CaptureBackend):
+    """
+    Captures the game window when it is found, the whole screen otherwise
+    """
+    name = "auto"
+
+    def __init__(self, locator=None, gray=CAPTURE_GRAYSCALE):
+        super().__init__(gray)
+        self.locator = locator or GameLocator()
+
+    def capture(self, window_title=None, region=None):
+        if self.locator.locate().hwnd:
+            return capture_window(locator=self.locator, gray=self.gray, pool=self.pool, region=region)
+        return capture_full_screen(self.gray, self.pool, region)
+
+
+class ReplayBackend(CaptureBackend):
+    """
+    Replays frames from an image file, a directory of images or a video file
+    """
+    name = "replay"
+
+    def __init__(self, source=REPLAY_SOURCE, fps=REPLAY_FPS, loop=REPLAY_LOOP, gray=CAPTURE_GRAYSCALE):
+        super().__init__(gray)
+        self.source = source
+        self.fps = fps
+        self.loop = loop
+        self.lock = threading.Lock()
+        self.start_time = None
+        self.captures = 0
+        self.video = None
+        self.video_index = -1
+        self.last_frame = None
+
+        if os.path.isdir(source):
+            self.files = sorted(
+                os.path.join(source, name) for name in os.listdir(source)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        elif source.lower().endswith(IMAGE_EXTENSIONS):
+            self.files = [source]
+        else:
+            self.files = None
+            self.video = cv2.VideoCapture(source)
+            if not self.video.isOpened():
+                print(f"Error opening replay video: {source}")
+
+    def _frame_index(self):
+        """
+        Index of the frame to return now
+        """
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        if self.fps > 0:
+            index = int((time.perf_counter() - self.start_time) * self.fps)
+        else:
+            index = self.captures
+        self.captures += 1
+        return index
+
+    def capture(self, window_title=None, region=None):
+        with self.lock:
+            index = self._frame_index()
+            try:
+                if self.files is not None:
+                    frame = self._read_file(index)
+                else:
+                    frame = self._read_video(index)
+            except Exception as e:
+                print(f"Error replaying frame: {e}")
+                return None
+        if frame is None or region is None:
+            return frame
+        left, top, width, height = region
+        return frame[top:top + height, left:left + width]
+
+    def _read_file(self, index):
+        if not self.files:
+            return None
+        if index >= len(self.files):
+            if not self.loop:
+                return None
+            index %= len(self.files)
+        return cv2.imread(self.files[index], cv2.IMREAD_GRAYSCALE if self.gray else cv2.IMREAD_COLOR)
+
+    def _read_video(self, index):
+        if self.video is None or not self.video.isOpened():
+            return None
+
+        frame_count = int(self.video.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count > 0 and index >= frame_count:
+            if not self.loop:
+                return None
+            index %= frame_count
+
+        # Already at this frame (polling faster than the replay rate)
+        if index == self.video_index and self.last_frame is not None:
+            return self.last_frame
+
+        # Wrapped around - start over from the first frame
+        if index < self.video_index:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.video_index = -1
+
+        # Skip frames up to the wanted one
+        while self.video_index < index:
+            if not self.video.grab():
+                return None
+            self.video_index += 1
+
+        ok, frame = self.video.retrieve()
+        if ok and self.gray:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.last_frame = frame if ok else None
+        return self.last_frame
+
+    def close(self):
+        with self.lock:
+            if self.video is not None:
+                self.video.release()
+                self.video = None
+
+
+def create_capture_backend(name=CAPTURE_BACKEND, locator=None):
+    """
+    Create capture backend by name
+    locator: GameLocator shared with the caller, so the game window is looked up once per check
+    """
+    backends = {
+        "auto": AutoBackend,
+        "window": WindowBackend,
+        "screen": ScreenBackend,
+        "replay": ReplayBackend,
+    }
+    if name not in backends:
+        print(f"Unknown capture backend '{name}', using auto")
+        name = "auto"
+    if name in ("auto", "window"):
+        return backends[name](locator)
+    return backends[name]()
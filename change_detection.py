@@ -0,0 +1,86 @@
+import threading
+import cv2
+from config import FRAME_THUMBNAIL_SIZE, FRAME_DIFF_THRESHOLD, BLACK_FRAME_THRESHOLD, FRAME_MAX_SKIPS
+
+# Frame check results
+FRAME_CHANGED = "changed"
+FRAME_UNCHANGED = "unchanged"
+FRAME_BLACK = "black"
+
+
+class FrameChangeDetector:
+    """
+    Compares downsampled thumbnails of consecutive frames so unchanged frames can skip OCR
+    """
+
+    def __init__(self, thumbnail_size=FRAME_THUMBNAIL_SIZE, diff_threshold=FRAME_DIFF_THRESHOLD,
+                 black_threshold=BLACK_FRAME_THRESHOLD, max_skips=FRAME_MAX_SKIPS):
+        self.thumbnail_size = thumbnail_size
+        self.diff_threshold = diff_threshold
+        self.black_threshold = black_threshold
+        self.max_skips = max_skips
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the reference frame and statistics
+        """
+        with self.lock:
+            self.reference = None
+            self.reference_shape = None
+            self.consecutive_skips = 0
+            self.total_frames = 0
+            self.unchanged_frames = 0
+            self.black_frames = 0
+
+    def thumbnail(self, image):
+        """
+        Downsample image to a small grayscale thumbnail
+        """
+        small = cv2.resize(image, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def check(self, image):
+        """
+        Classify frame as FRAME_CHANGED, FRAME_UNCHANGED or FRAME_BLACK
+        """
+        thumb = self.thumbnail(image)
+
+        with self.lock:
+            self.total_frames += 1
+
+            # Minimized windows capture as (almost) all-black frames
+            if thumb.max() < self.black_threshold:
+                self.black_frames += 1
+                return FRAME_BLACK
+
+            if (self.reference is not None and self.reference_shape == image.shape
+                    and self.consecutive_skips < self.max_skips
+                    and cv2.absdiff(thumb, self.reference).max() <= self.diff_threshold):
+                self.consecutive_skips += 1
+                self.unchanged_frames += 1
+                return FRAME_UNCHANGED
+
+            self.reference = thumb
+            self.reference_shape = image.shape
+            self.consecutive_skips = 0
+            return FRAME_CHANGED
+
+    def skip_ratio(self):
+        """
+        Share of checked frames that skipped OCR (unchanged or black)
+        """
+        with self.lock:
+            if not self.total_frames:
+                return 0.0
+            return (self.unchanged_frames + self.black_frames) / self.total_frames
+
+    def get_stats(self):
+        """
+        Returns: (total, unchanged, black) frame counts
+        """
+        with self.lock:
+            return self.total_frames, self.unchanged_frames, self.black_frames
@@ -1,16 +1,105 @@
 import os
 
 # Global settings
-CHECK_INTERVAL = 5  # Check interval in seconds
+CHECK_INTERVAL = 5  # Check interval in seconds (used when not in queue)
+MIN_CHECK_INTERVAL = 0.5  # Fastest polling, near the front of the queue
+MAX_CHECK_INTERVAL = 30  # Slowest polling, far back in the queue
+POLL_FRONT_POSITION = 3  # At or below this position poll at MIN_CHECK_INTERVAL
+POLL_FAR_POSITION = 100  # At or beyond this position poll at MAX_CHECK_INTERVAL (until the drain rate is known)
 TESSERACT_PATH = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 OCR_CONFIG = '--psm 6'  # Page segmentation mode: assumes single text block
+OCR_ENGINE = "auto"  # "auto" (tesserocr if installed), "tesserocr" or "pytesseract"
+OCR_LANGUAGE = "eng"
+OCR_FAST_CONFIG = '--psm 7'  # Single text line - used on the cropped queue panel
+OCR_CONFIDENCE_THRESHOLD = 0.6  # Tesseract results below this confidence (0-1) escalate to the next stage
+TESSDATA_PATH = os.path.join(os.path.dirname(TESSERACT_PATH), "tessdata")
 
 # Queue detection patterns (always in English regardless of interface language)
 QUEUE_TEXT_PATTERN = r"Position:\s*(\d+)\s*/\s*(\d+)"  # Pattern "Position: X / Y"
+# Queue text layouts matched with OCR error tolerance; {position} and {total} are the numbers
+QUEUE_LAYOUTS = [
+    "Position: {position} / {total}",
+    "Position {position} of {total}",
+    "Queue: {position} / {total}",
+    "{position} / {total} in queue",
+]
+QUEUE_KEYWORDS = ["Position:", "Leave queue"]  # Text that means in queue even when the numbers are unreadable
+
+# Image preprocessing before OCR, by minimum frame height (the largest one not above the frame's is used)
+PREPROCESS_PROFILES = {
+    0: {"scale": 1.0, "color_key": True, "threshold": "otsu", "morphology": 0},
+    1440: {"scale": 0.75, "color_key": True, "threshold": "otsu", "morphology": 0},
+    2160: {"scale": 0.5, "color_key": True, "threshold": "otsu", "morphology": 2},
+}
+TEXT_COLOR_KEY = ((0, 0, 170), (180, 70, 255))  # HSV range of the queue text color (white/light grey)
+
+# Capture/OCR pipeline
+OCR_WORKERS = 1  # OCR worker threads consuming captured frames
+FRAME_QUEUE_SIZE = 2  # Captured frames waiting for OCR; older ones are dropped when full
+
+# Multi-target mode: monitor every running game client (one row per client) instead of one game window
+MULTI_TARGET_MODE = False
+MULTI_TARGET_STAGGER = 0.5  # Minimum seconds between captures of different clients
+TARGET_DISCOVERY_INTERVAL = 5  # Seconds between scans for started or exited clients
+
+# OCR execution: "thread" runs OCR in the pipeline worker threads, "process" hands frames
+# to a process pool through shared memory (OpenCV and Tesseract then run outside the GIL)
+OCR_EXECUTION_MODE = "thread"
+OCR_POOL_SIZE = 2  # Worker processes in "process" mode
+OCR_WORKER_MAX_TASKS = 500  # Frames a worker process handles before it is replaced (0 - never)
+
+# Capture backend: "auto" (game window, falling back to full screen), "window", "screen" or "replay"
+CAPTURE_BACKEND = "auto"
+REPLAY_SOURCE = "test_capture.png"  # Image file, directory of images or video file for the replay backend
+REPLAY_FPS = 0  # Replay frames per second of wall-clock time; 0 advances one frame per capture
+REPLAY_LOOP = True  # Start over at the end of the replay source
+SCREEN_CAPTURE_MONITOR = 1  # Monitor captured by the screen fallback when mss is installed (1 - primary)
+CAPTURE_QUEUE_PANEL_ONLY = True  # Once the queue panel is located, grab only its pixels
+FULL_CAPTURE_INTERVAL = 20  # Grab the whole frame at least every this many captures, to notice layout changes
+CAPTURE_GRAYSCALE = False  # Capture frames straight to grayscale (faster, but disables text color keying)
+CAPTURE_POOL_SIZE = FRAME_QUEUE_SIZE + OCR_WORKERS + 2  # Reused frame buffers: queued, in OCR and being captured
+
+# Queue panel region of interest (ROI) settings
+ROI_ANCHOR_WORD = "Position"  # Word that marks the queue panel on screen
+ROI_PADDING = 1.0  # Padding around the located panel, in text line heights
+ROI_RIGHT_EXTENSION = 4.0  # Extra room to the right for growing numbers, in text line heights
+ROI_CACHE_PATH = os.path.join(os.getcwd(), "roi_cache.json")
+
+# Queue ETA estimation
+ETA_HISTORY_SIZE = 256  # Samples kept in the ring buffer
+ETA_RATE_TIME_CONSTANT = 300  # Seconds over which the drain rate estimate adapts
+ETA_JUMP_TOLERANCE = 3  # Unexpected position moves larger than this need a second sample to confirm
+
+# Queue state: after leaving the queue the server is loading for this long, then the client counts as in game
+LOADING_STATE_SECONDS = 60
+QUEUE_EXIT_FRAMES = 2  # Consecutive frames without the queue needed to leave it (one misread is not an entry)
+
+# Frame change detection (skip OCR when the screen has not changed)
+FRAME_THUMBNAIL_SIZE = (160, 90)  # Downsampled size used to compare frames
+FRAME_DIFF_THRESHOLD = 8  # Max per-pixel thumbnail difference (0-255) still considered unchanged
+BLACK_FRAME_THRESHOLD = 10  # Frames whose brightest thumbnail pixel is below this are treated as black
+FRAME_MAX_SKIPS = 12  # Force OCR after this many consecutive unchanged frames
+
+# Template-matching digit recognizer for the queue panel
+DIGIT_TEMPLATES_PATH = os.path.join(os.getcwd(), "digit_templates.npz")
+DIGIT_MIN_CONFIDENCE = 0.85  # Reads below this confidence fall back to Tesseract
+DIGIT_TEMPLATES_PER_GLYPH = 5  # Samples kept per learned glyph
 
 # In-game indicators (words that may indicate game status)
 IN_GAME_INDICATORS = ["Deploy", "Respawn", "Squad", "Main Menu", "Leave queue"]
 
+# UI updates from background threads are applied in batches this often (milliseconds)
+UI_UPDATE_INTERVAL = 100
+
+# Seconds a test capture waits for the monitoring engine, which is loaded in the background at startup
+ENGINE_LOAD_TIMEOUT = 30
+
+# Log: recent entries kept for the debug tab, full log written to a rotating file
+LOG_BUFFER_SIZE = 1000  # Entries kept in memory (identical consecutive messages count once)
+LOG_FILE_PATH = os.path.join(os.getcwd(), "logs", "monitor.log")
+LOG_FILE_MAX_BYTES = 1024 * 1024  # Size at which the log file is rotated
+LOG_FILE_BACKUPS = 3  # Rotated log files kept
+
 # Local logo path
 assets_dir = os.path.join(os.getcwd(), "assets")
 os.makedirs(assets_dir, exist_ok=True)
@@ -23,4 +112,12 @@ CREATOR_GITHUB_URL = "https://github.com/blockmaterial"  # Replace with your act
 
 # Debug paths
 DEBUG_DIR = os.path.join(os.getcwd(), "debug")
-os.makedirs(DEBUG_DIR, exist_ok=True)
\ No newline at end of file
+os.makedirs(DEBUG_DIR, exist_ok=True)
+
+# Debug frame recorder (when saving screenshots is enabled)
+DEBUG_RING_SIZE = 10  # Recent recognized frames kept in memory and dumped on state changes
+DEBUG_IMAGE_FORMAT = "png"  # "png", "jpg" or "webp"
+DEBUG_IMAGE_QUALITY = 90  # JPEG/WebP quality (0-100)
+DEBUG_PNG_COMPRESSION = 3  # PNG compression level (0-9)
+DEBUG_CROP_ONLY = False  # Keep only the queue panel region of frames once it is located
+DEBUG_MAX_FRAME_WIDTH = 1280  # Whole frames are kept downscaled to this width (pixels)
\ No newline at end of file
@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+from collections import deque, namedtuple
+import cv2
+from config import (
+    DEBUG_DIR, DEBUG_RING_SIZE, DEBUG_IMAGE_FORMAT, DEBUG_IMAGE_QUALITY, DEBUG_PNG_COMPRESSION,
+    DEBUG_CROP_ONLY, DEBUG_MAX_FRAME_WIDTH
+)
+from roi import crop_region
+
+# One recognized frame kept for debugging
+DebugTick = namedtuple("DebugTick", ["timestamp", "image", "processed", "text", "status"])
+
+MAX_PENDING_DUMPS = 4  # Ring dumps waiting for the writer; older ones are dropped beyond this
+
+
+def image_write_params(image_format, quality, png_compression):
+    """
+    cv2.imwrite parameters for the format
+    """
+    if image_format in ("jpg", "jpeg"):
+        return [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if image_format == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, max(1, quality)]
+    return [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+
+
+def downscaled_copy(image, max_width):
+    """
+    Copy of image, downscaled to max_width when it is wider
+    """
+    height, width = image.shape[:2]
+    if width <= max_width:
+        return image.copy()
+    factor = width / max_width
+    # Area averaging is fast for whole-number factors only
+    interpolation = cv2.INTER_AREA if factor.is_integer() else cv2.INTER_LINEAR
+    return cv2.resize(image, (max_width, max(1, round(height / factor))), interpolation=interpolation)
+
+
+class DebugFrameRecorder:
+    """
+    Keeps the last ticks (frame, processed image, OCR text) in a bounded in-memory ring and
+    writes on a background thread: the newest tick replaces the debug_* files, and dump()
+    saves the whole ring to its own directory (e.g. when entering the server).
+    record() and dump() only hand references over, so the monitor loop never waits for the disk.
+    The ring holds copies - queue panel crops in crop-only mode, whole frames downscaled to max_width
+    otherwise - so it never keeps capture buffers or full-resolution frames alive.
+    """
+
+    def __init__(self, directory=DEBUG_DIR, size=DEBUG_RING_SIZE, image_format=DEBUG_IMAGE_FORMAT,
+                 quality=DEBUG_IMAGE_QUALITY, png_compression=DEBUG_PNG_COMPRESSION, crop_only=DEBUG_CROP_ONLY,
+                 max_width=DEBUG_MAX_FRAME_WIDTH):
+        self.directory = directory
+        self.image_format = image_format.lower().lstrip(".")
+        self.write_params = image_write_params(self.image_format, quality, png_compression)
+        self.crop_only = crop_only
+        self.max_width = max_width
+        self.ring = deque(maxlen=size)
+        self.condition = threading.Condition()
+        self.pending_latest = None
+        self.pending_dumps = deque(maxlen=MAX_PENDING_DUMPS)
+        self.written = 0
+        self.dropped = 0
+        self.closed = False
+        self.thread = None
+
+    def record(self, image, processed, text, status, region=None):
+        """
+        Add a tick to the ring and schedule writing it as the newest debug files
+        region: queue panel region, used in crop-only mode
+        """
+        if self.crop_only and region is not None:
+            # Copy the crops so the ring does not keep full frames alive
+            frame_width = image.shape[1]
+            image = crop_region(image, region).copy()
+            # Full-frame OCR stages return a processed image of the whole (possibly downscaled) frame;
+            # a processed queue panel crop is never wider than the region
+            if processed is not None and processed.shape[1] > region[2]:
+                scale = processed.shape[1] / frame_width
+                processed = crop_region(processed, tuple(round(value * scale) for value in region))
+        else:
+            # Frames are pooled capture buffers, reused once the frame is recognized; a downscaled
+            # copy keeps the ring small at high resolutions (10 4K frames would be about 250 MB)
+            image = downscaled_copy(image, self.max_width)
+        if processed is not None:
+            # Processed images are reused preprocessing buffers
+            processed = processed.copy()
+
+        tick = DebugTick(time.time(), image, processed, text, status)
+        with self.condition:
+            self.ring.append(tick)
+            if self.pending_latest is not None:
+                # Writer has not caught up - the older tick is superseded
+                self.dropped += 1
+            self.pending_latest = tick
+            self._start_writer()
+            self.condition.notify()
+
+    def dump(self, reason):
+        """
+        Schedule writing every tick in the ring to debug/<time>_<reason>/
+        """
+        with self.condition:
+            if not self.ring:
+                return
+            if len(self.pending_dumps) == self.pending_dumps.maxlen:
+                self.dropped += 1
+            self.pending_dumps.append((reason, time.time(), list(self.ring)))
+            self._start_writer()
+            self.condition.notify()
+
+    def clear(self):
+        with self.condition:
+            self.ring.clear()
+
+    def close(self):
+        """
+        Write what is pending and stop the writer thread
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def get_stats(self):
+        """
+        Returns: (ticks in ring, files written, writes dropped)
+        """
+        with self.condition:
+            return len(self.ring), self.written, self.dropped
+
+    def _start_writer(self):
+        if self.thread is None and not self.closed:
+            self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+            self.thread.start()
+
+    def _writer_loop(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: self.pending_latest is not None or self.pending_dumps or self.closed
+                )
+                latest, self.pending_latest = self.pending_latest, None
+                dumps = list(self.pending_dumps)
+                self.pending_dumps.clear()
+                closed = self.closed
+
+            try:
+                if latest is not None:
+                    self._write_tick(latest, self.directory, "debug_")
+                for reason, timestamp, ticks in dumps:
+                    self._write_dump(reason, timestamp, ticks)
+            except Exception as e:
+                print(f"Error saving debug images: {e}")
+
+            if closed:
+                return
+
+    def _write_image(self, path, image):
+        if image is not None and cv2.imwrite(path, image, self.write_params):
+            self.written += 1
+
+    def _write_tick(self, tick, directory, prefix):
+        os.makedirs(directory, exist_ok=True)
+        self._write_image(os.path.join(directory, f"{prefix}screenshot.{self.image_format}"), tick.image)
+        self._write_image(os.path.join(directory, f"{prefix}processed.{self.image_format}"), tick.processed)
+        with open(os.path.join(directory, f"{prefix}text.txt"), "w", encoding="utf-8") as f:
+            f.write(f"# {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(tick.timestamp))} status={tick.status}\n")
+            f.write(tick.text or "")
+
+    def _write_dump(self, reason, timestamp, ticks):
+        name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(timestamp))}_{reason}"
+        directory = os.path.join(self.directory, name)
+        for index, tick in enumerate(ticks):
+            self._write_tick(tick, directory, f"{index:02d}_")
+
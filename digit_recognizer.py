@@ -0,0 +1,207 @@
+import os
+import re
+import threading
+from collections import namedtuple
+import cv2
+import numpy as np
+from config import DIGIT_TEMPLATES_PATH, DIGIT_TEMPLATES_PER_GLYPH
+
+# Result of reading the queue panel: position/total are None when the read failed
+DigitReading = namedtuple("DigitReading", ["position", "total", "confidence", "text"])
+
+GLYPH_SIZE = 24  # Glyphs are normalized into a GLYPH_SIZE x GLYPH_SIZE square
+MIN_GLYPH_HEIGHT = 0.35  # Components lower than this share of the tallest one are dots/noise
+READING_PATTERN = re.compile(r"(\d+)/(\d+)$")
+
+
+class DigitRecognizer:
+    """
+    Reads "Position: X / Y" from a preprocessed queue panel crop by matching connected
+    components against glyph templates learned from labelled crops.
+    templates_path None keeps the templates in memory only (OCR worker processes).
+    """
+
+    def __init__(self, templates_path=DIGIT_TEMPLATES_PATH):
+        self.templates_path = templates_path
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.samples = {}  # glyph -> list of normalized vectors
+        self.labels = []
+        self.matrix = None
+        self.version = 0  # Incremented on every change of the templates
+        self.load()
+        self.saved_version = self.version  # Version of the templates in templates_path
+
+    def is_trained(self):
+        """
+        Check that all digits and the slash have templates
+        """
+        with self.lock:
+            return all(glyph in self.samples for glyph in "0123456789/")
+
+    def load(self, path=None):
+        """
+        Load learned templates from disk
+        path: file to read instead of templates_path, e.g. the parent's templates in an OCR worker process
+        """
+        path = path or self.templates_path
+        if path is None:
+            return
+        try:
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    self.set_templates(data["labels"], data["vectors"])
+        except Exception as e:
+            print(f"Error loading digit templates: {e}")
+            self.samples = {}
+            self._rebuild()
+
+    def save(self):
+        """
+        Persist learned templates to disk
+        """
+        if self.templates_path is None:
+            return
+        try:
+            # One save at a time, so an older snapshot never replaces a newer one
+            with self.save_lock:
+                with self.lock:
+                    version = self.version
+                    labels = [glyph for glyph, vectors in self.samples.items() for _ in vectors]
+                    vectors = [vector for glyph_vectors in self.samples.values() for vector in glyph_vectors]
+                # Write a temporary file and swap it in, so OCR worker processes never read a partial file
+                temp_path = self.templates_path + ".tmp"
+                with open(temp_path, "wb") as f:
+                    np.savez(f, labels=np.array(labels), vectors=np.array(vectors, np.float32))
+                os.replace(temp_path, self.templates_path)
+                self.saved_version = version
+        except Exception as e:
+            print(f"Error saving digit templates: {e}")
+
+    def get_templates(self):
+        """
+        Returns: (labels, vectors) of all templates, e.g. to seed a recognizer in another process
+        """
+        with self.lock:
+            return list(self.labels), self.matrix
+
+    def set_templates(self, labels, vectors):
+        """
+        Replace all templates with (labels, vectors) from get_templates
+        """
+        samples = {}
+        if vectors is not None:
+            for glyph, vector in zip(labels, vectors):
+                samples.setdefault(str(glyph), []).append(vector)
+        with self.lock:
+            self.samples = samples
+            self._rebuild()
+            self.version += 1
+
+    def _rebuild(self):
+        """
+        Stack templates into one matrix for matching
+        """
+        self.labels = [glyph for glyph, vectors in self.samples.items() for _ in vectors]
+        vectors = [vector for glyph_vectors in self.samples.values() for vector in glyph_vectors]
+        self.matrix = np.array(vectors, np.float32) if vectors else None
+
+    @staticmethod
+    def segment(image):
+        """
+        Split binary image into glyph vectors, ordered left to right
+        """
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        # Text must be the foreground - preprocessing renders it dark on light background
+        if cv2.mean(image)[0] > 127:
+            image = cv2.bitwise_not(image)
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(image, connectivity=8)
+        if count <= 1:
+            return []
+
+        boxes = stats[1:, :4]
+        max_height = boxes[:, 3].max()
+        boxes = boxes[boxes[:, 3] >= max_height * MIN_GLYPH_HEIGHT]
+        boxes = boxes[np.argsort(boxes[:, 0])]
+
+        glyphs = []
+        for left, top, width, height in boxes:
+            glyphs.append(DigitRecognizer._normalize(image[top:top + height, left:left + width]))
+        return glyphs
+
+    @staticmethod
+    def _normalize(glyph):
+        """
+        Fit glyph into a square keeping its aspect ratio, as a zero-mean unit vector
+        """
+        height, width = glyph.shape
+        scale = GLYPH_SIZE / max(height, width)
+        new_width = max(1, int(round(width * scale)))
+        new_height = max(1, int(round(height * scale)))
+        resized = cv2.resize(glyph, (new_width, new_height), interpolation=cv2.INTER_AREA)
+
+        canvas = np.zeros((GLYPH_SIZE, GLYPH_SIZE), np.float32)
+        top = (GLYPH_SIZE - new_height) // 2
+        left = (GLYPH_SIZE - new_width) // 2
+        canvas[top:top + new_height, left:left + new_width] = resized
+
+        vector = canvas.ravel()
+        vector -= vector.mean()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def learn(self, image, label):
+        """
+        Learn glyph templates from a crop and its text (e.g. "Position: 12 / 45")
+        Returns: True if the crop was split into as many glyphs as the label has
+        """
+        glyph_labels = [c for c in label if not c.isspace() and c != ":"]
+        glyphs = self.segment(image)
+        if not glyph_labels or len(glyphs) != len(glyph_labels):
+            return False
+
+        with self.lock:
+            for glyph, vector in zip(glyph_labels, glyphs):
+                vectors = self.samples.setdefault(glyph, [])
+                vectors.append(vector)
+                # Keep only the most recent samples
+                del vectors[:-DIGIT_TEMPLATES_PER_GLYPH]
+            self._rebuild()
+            self.version += 1
+        self.save()
+        return True
+
+    def read(self, image):
+        """
+        Read queue position and total from a preprocessed queue panel crop
+        Returns: DigitReading; confidence is 0 when the numbers could not be read
+        """
+        with self.lock:
+            matrix, labels = self.matrix, self.labels
+        if matrix is None or image is None:
+            return DigitReading(None, None, 0.0, "")
+
+        glyphs = self.segment(image)
+        if not glyphs:
+            return DigitReading(None, None, 0.0, "")
+
+        # Correlation of each glyph with each template
+        scores = np.array(glyphs) @ matrix.T
+        best = scores.argmax(axis=1)
+        text = "".join(labels[i] for i in best)
+
+        match = READING_PATTERN.search(text)
+        if not match:
+            return DigitReading(None, None, 0.0, text)
+
+        position, total = int(match.group(1)), int(match.group(2))
+        if position > total:
+            return DigitReading(None, None, 0.0, text)
+
+        # A read is only as reliable as its weakest number glyph
+        number_scores = scores[np.arange(len(best)), best][match.start():match.end()]
+        confidence = float(max(0.0, number_scores.min()))
+        return DigitReading(position, total, confidence, text)
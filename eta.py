@@ -0,0 +1,145 @@
+import math
+import threading
+from array import array
+from config import ETA_HISTORY_SIZE, ETA_RATE_TIME_CONSTANT, ETA_JUMP_TOLERANCE
+
+
+class QueueEtaEstimator:
+    """
+    Estimates time until entering the server from (timestamp, position, total) samples.
+    The drain rate is a time-weighted moving average of observed position changes with
+    clipped residuals, so OCR misreads and people leaving the queue do not throw it off.
+    Each sample is processed in O(1).
+    """
+
+    def __init__(self, capacity=ETA_HISTORY_SIZE, time_constant=ETA_RATE_TIME_CONSTANT,
+                 jump_tolerance=ETA_JUMP_TOLERANCE):
+        self.capacity = capacity
+        self.time_constant = time_constant
+        self.jump_tolerance = jump_tolerance
+
+        # Ring buffer of accepted samples
+        self.times = array("d", [0.0]) * capacity
+        self.positions = array("l", [0]) * capacity
+        self.totals = array("l", [0]) * capacity
+
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all samples and the drain rate
+        """
+        with self.lock:
+            self.count = 0
+            self.index = 0
+            self.last_position = None
+            self.change_time = None  # When the position last changed
+            self.rate = None  # Positions per second
+            self.deviation = None  # Mean absolute deviation of the rate
+            self.pending = None  # Unconfirmed sample that deviated from the prediction
+
+    def add_sample(self, timestamp, position, total):
+        """
+        Add a queue position sample
+        Returns: True if the sample was accepted, False if it is held as a possible outlier
+        """
+        if position is None:
+            return False
+
+        with self.lock:
+            if self.last_position is not None and self._is_unexpected(timestamp, position):
+                pending = self.pending
+                if pending is None or abs(position - pending[1]) > self.jump_tolerance:
+                    # Hold until a second sample confirms it
+                    self.pending = (timestamp, position, total)
+                    return False
+                # Two consistent samples - a real jump, not an OCR misread
+                self._accept(*pending)
+
+            self.pending = None
+            self._accept(timestamp, position, total)
+            return True
+
+    def _is_unexpected(self, timestamp, position):
+        """
+        Check whether position is further from the predicted one than the tolerance
+        """
+        expected_drop = self.rate * (timestamp - self.change_time) if self.rate else 0.0
+        expected = self.last_position - expected_drop
+        return abs(position - expected) > self.jump_tolerance + expected_drop
+
+    def _accept(self, timestamp, position, total):
+        """
+        Store sample and update the drain rate
+        """
+        self.times[self.index] = timestamp
+        self.positions[self.index] = position
+        self.totals[self.index] = total if total is not None else 0
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+        if self.last_position is None:
+            self.change_time = timestamp
+        elif position < self.last_position:
+            elapsed = timestamp - self.change_time
+            if elapsed > 0:
+                self._update_rate((self.last_position - position) / elapsed, elapsed)
+            self.change_time = timestamp
+        elif position > self.last_position:
+            # Moved back in the queue (rejoined) - start over
+            self.rate = None
+            self.deviation = None
+            self.change_time = timestamp
+
+        self.last_position = position
+
+    def _update_rate(self, sample_rate, elapsed):
+        """
+        Time-weighted moving average with residuals clipped to 3 mean absolute deviations
+        """
+        if self.rate is None:
+            self.rate = sample_rate
+            self.deviation = sample_rate / 2
+            return
+
+        alpha = 1 - math.exp(-elapsed / self.time_constant)
+        residual = sample_rate - self.rate
+        limit = 3 * self.deviation
+        clipped = max(-limit, min(limit, residual))
+        self.rate = max(self.rate + alpha * clipped, 1e-6)
+        self.deviation = max(self.deviation + alpha * (abs(clipped) - self.deviation), self.rate * 0.05)
+
+    def get_rate(self):
+        """
+        Drain rate in positions per second, or None if unknown
+        """
+        with self.lock:
+            return self.rate
+
+    def eta_seconds(self, now):
+        """
+        Estimated seconds until entering the server, or None if unknown
+        """
+        with self.lock:
+            if self.rate is None or self.last_position is None:
+                return None
+            # The position has not changed since change_time, so at least position - 1 moves remain
+            elapsed = now - self.change_time
+            return max(self.last_position / self.rate - elapsed, (self.last_position - 1) / self.rate)
+
+    def eta_minutes(self, now):
+        """
+        Estimated whole minutes until entering the server, or None if unknown
+        """
+        seconds = self.eta_seconds(now)
+        return None if seconds is None else max(1, math.ceil(seconds / 60))
+
+    def get_samples(self):
+        """
+        Returns: list of (timestamp, position, total) samples, oldest first
+        """
+        with self.lock:
+            start = (self.index - self.count) % self.capacity
+            indices = [(start + i) % self.capacity for i in range(self.count)]
+            return [(self.times[i], self.positions[i], self.totals[i]) for i in indices]
@@ -0,0 +1,10 @@
+# Event types passed to MonitorEngine.on_event (kept apart from monitor_engine, so the UI
+# can handle events without importing the OCR and capture modules)
+EVENT_STARTED = "started"
+EVENT_STOPPED = "stopped"
+EVENT_GAME = "game"  # Game process or window found, changed or lost
+EVENT_STATUS = "status"  # Queue status of a recognized frame
+EVENT_ENTERED = "entered_server"
+EVENT_TARGET_ADDED = "target_added"
+EVENT_TARGET_REMOVED = "target_removed"
+EVENT_ERROR = "error"
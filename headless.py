@@ -0,0 +1,70 @@
+"""
+Headless queue monitoring: runs the monitoring engine without Tkinter and writes its
+events to stdout as newline-delimited JSON, one object per line.
+
+    python main.py --headless [--backend replay] [--replay-source frames/] [--duration 3600]
+
+Everything else the modules print (warnings, diagnostics) goes to stderr, so stdout
+stays machine-readable.
+"""
+import json
+import signal
+import sys
+import threading
+import time
+
+
+class EventWriter:
+    """
+    Writes events as JSON lines; called from the capture and OCR threads
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def run_headless(args):
+    """
+    Monitor until interrupted (Ctrl+C, SIGTERM) or until args.duration seconds have passed
+    """
+    # Keep stdout for events only
+    write_event = EventWriter(sys.stdout)
+    sys.stdout = sys.stderr
+
+    from monitor_engine import MonitorEngine
+    from capture_backends import ReplayBackend, create_capture_backend
+
+    backend = None
+    if args.replay_source:
+        backend = ReplayBackend(args.replay_source, fps=args.replay_fps)
+    elif args.backend:
+        backend = create_capture_backend(args.backend)
+
+    engine = MonitorEngine(
+        on_event=write_event,
+        capture_backend=backend,
+        multi_target=args.multi_target,
+        notify=not args.no_notify
+    )
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    deadline = time.monotonic() + args.duration if args.duration else None
+    engine.start()
+    try:
+        # Short waits keep Ctrl+C responsive on Windows
+        while not stop_event.wait(1):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+    finally:
+        engine.close()
+    return 0
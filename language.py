@@ -1,49 +1,64 @@
 import os
 import json
-import tkinter as tk
+import threading
+
+
+class MessageTemplate:
+    """
+    Translation looked up once for the current language; format() only fills in the values
+    """
+    __slots__ = ("key", "text")
+
+    def __init__(self, key, text):
+        self.key = key
+        self.text = text
+
+    def format(self, *args):
+        if args and isinstance(self.text, str):
+            return self.text.format(*args)
+        return self.text
+
 
 class I18n:
     """
-    Simple internationalization class for handling translations
+    Simple internationalization class for handling translations.
+    Translation files are read on first use, not at import.
     """
 
     def __init__(self, default_lang="en"):
-        self.translations = {}
+        self.translations = None
         self.current_lang = default_lang
-        self.load_translations()
+        self.lock = threading.Lock()
+        # MessageTemplate per key for the current language, rebuilt after a language change
+        self.templates = {}
 
     def load_translations(self):
         """
-        Load all translation files from translations directory
+        Load all translation files from translations directory; languages without
+        a file use the built-in defaults
         """
+        translations = {
+            "en": self._get_english_translations(),
+            "uk": self._get_ukrainian_translations(),
+        }
         translations_dir = os.path.join(os.getcwd(), "translations")
-        os.makedirs(translations_dir, exist_ok=True)
-
-        # Create default translation files if they don't exist
-        self._create_default_translation_files(translations_dir)
-
-        # Load all translation files
-        for filename in os.listdir(translations_dir):
-            if filename.endswith(".json"):
-                lang_code = filename.split(".")[0]
-                with open(os.path.join(translations_dir, filename), 'r', encoding='utf-8') as f:
-                    self.translations[lang_code] = json.load(f)
-
-    def _create_default_translation_files(self, translations_dir):
-        """
-        Create default translation files if they don't exist
-        """
-        # English translations
-        en_file = os.path.join(translations_dir, "en.json")
-        if not os.path.exists(en_file):
-            with open(en_file, 'w', encoding='utf-8') as f:
-                json.dump(self._get_english_translations(), f, ensure_ascii=False, indent=4)
-
-        # Ukrainian translations
-        uk_file = os.path.join(translations_dir, "uk.json")
-        if not os.path.exists(uk_file):
-            with open(uk_file, 'w', encoding='utf-8') as f:
-                json.dump(self._get_ukrainian_translations(), f, ensure_ascii=False, indent=4)
+        if os.path.isdir(translations_dir):
+            for filename in os.listdir(translations_dir):
+                if filename.endswith(".json"):
+                    lang_code = filename.split(".")[0]
+                    try:
+                        with open(os.path.join(translations_dir, filename), 'r', encoding='utf-8') as f:
+                            translations[lang_code] = json.load(f)
+                    except (OSError, ValueError) as e:
+                        print(f"Error loading translations {filename}: {e}")
+        self.translations = translations
+
+    def _ensure_loaded(self):
+        if self.translations is None:
+            with self.lock:
+                if self.translations is None:
+                    self.load_translations()
+        return self.translations
 
     def _get_english_translations(self):
         # English translations dictionary
@@ -65,28 +80,35 @@ class I18n:
         """
         Set the current language
         """
-        if lang_code in self.translations:
+        if lang_code in self._ensure_loaded():
             self.current_lang = lang_code
+            self.templates = {}
             return True
         return False
 
+    def template(self, key):
+        """
+        Precompiled template for the key in the current language
+        """
+        templates = self.templates
+        template = templates.get(key)
+        if template is None:
+            # Get translation for the key, or fallback to English, or fallback to the key itself
+            translations = self._ensure_loaded()
+            translation = translations.get(self.current_lang, {}).get(key)
+            if translation is None:
+                translation = translations.get("en", {}).get(key, key)
+            template = templates[key] = MessageTemplate(key, translation)
+        return template
+
     def get(self, key, *args):
         """
         Get translated text for the key in the current language
         """
-        # Get translation for the key, or fallback to English, or fallback to the key itself
-        translation = self.translations.get(self.current_lang, {}).get(key)
-        if translation is None:
-            translation = self.translations.get("en", {}).get(key, key)
-
-        # Format with args if provided
-        if args and isinstance(translation, str):
-            return translation.format(*args)
-
-        return translation
+        return self.template(key).format(*args)
 
 
-# Create global instance
+# Create global instance (translations are loaded on first use)
 i18n = I18n()
 
 
@@ -0,0 +1,153 @@
+import atexit
+import bisect
+import logging
+import os
+import queue
+import re
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from config import LOG_BUFFER_SIZE, LOG_FILE_PATH, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class LogBuffer:
+    """
+    Fixed-size ring of the most recent log entries with an inverted word index for search.
+    A message identical to the previous one increases its repeat count instead of adding
+    an entry. Entries have consecutive sequence numbers, so the position of an entry in
+    the ring is its sequence number minus the oldest one.
+    """
+
+    def __init__(self, capacity=LOG_BUFFER_SIZE):
+        self.capacity = capacity
+        # Entries are [seq, timestamp, message, count]
+        self.entries = [None] * capacity
+        self.start = 0
+        self.count = 0
+        self.next_seq = 0
+        self.index = {}
+        # Indexed words in sorted order, so a prefix is a contiguous range found with bisect
+        self.words = []
+        self.lock = threading.Lock()
+        # Changes whenever an entry is added or collapsed - lets viewers skip redundant redraws
+        self.version = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, timestamp, message):
+        """
+        Add a message, collapsing it into the previous entry when identical
+        """
+        with self.lock:
+            self.version += 1
+            if self.count:
+                last = self.entries[(self.start + self.count - 1) % self.capacity]
+                if last[2] == message:
+                    last[1] = timestamp
+                    last[3] += 1
+                    return
+
+            if self.count == self.capacity:
+                # Drop the oldest entry and its index postings
+                oldest = self.entries[self.start]
+                self._unindex(oldest)
+                self.start = (self.start + 1) % self.capacity
+                self.count -= 1
+
+            entry = [self.next_seq, timestamp, message, 1]
+            self.entries[(self.start + self.count) % self.capacity] = entry
+            self.count += 1
+            self.next_seq += 1
+            for word in set(WORD_PATTERN.findall(message.lower())):
+                postings = self.index.get(word)
+                if postings is None:
+                    postings = self.index[word] = set()
+                    bisect.insort(self.words, word)
+                postings.add(entry[0])
+
+    def _unindex(self, entry):
+        for word in set(WORD_PATTERN.findall(entry[2].lower())):
+            postings = self.index.get(word)
+            if postings is not None:
+                postings.discard(entry[0])
+                if not postings:
+                    del self.index[word]
+                    del self.words[bisect.bisect_left(self.words, word)]
+
+    def clear(self):
+        with self.lock:
+            self.entries = [None] * self.capacity
+            self.start = 0
+            self.count = 0
+            self.index.clear()
+            self.words.clear()
+            self.version += 1
+
+    def get(self, position):
+        """
+        Entry at position (0 - oldest) as (timestamp, message, count)
+        """
+        with self.lock:
+            _, timestamp, message, count = self.entries[(self.start + position) % self.capacity]
+            return timestamp, message, count
+
+    def search(self, query):
+        """
+        Positions of the entries containing every word of query (words match by prefix),
+        looked up in the index rather than by scanning the messages
+        Returns: sorted list of positions, or None for an empty query
+        """
+        words = WORD_PATTERN.findall(query.lower())
+        if not words:
+            return None
+
+        with self.lock:
+            matches = None
+            for word in words:
+                postings = set()
+                position = bisect.bisect_left(self.words, word)
+                while position < len(self.words) and self.words[position].startswith(word):
+                    postings |= self.index[self.words[position]]
+                    position += 1
+                matches = postings if matches is None else matches & postings
+                if not matches:
+                    return []
+            oldest_seq = self.next_seq - self.count
+            return sorted(seq - oldest_seq for seq in matches)
+
+
+def format_entry(timestamp, message, count):
+    """
+    Log line as shown in the viewer
+    """
+    line = f"[{timestamp}] {message}"
+    return f"{line} (×{count})" if count > 1 else line
+
+
+def start_file_log(path=LOG_FILE_PATH, max_bytes=LOG_FILE_MAX_BYTES, backups=LOG_FILE_BACKUPS):
+    """
+    Logger that writes every message to a size-rotated file. Records are queued and written
+    by a listener thread, so logging never waits for the disk.
+    Returns: logging.Logger (None if the file could not be opened)
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    except OSError as e:
+        print(f"Error opening log file: {e}")
+        return None
+    file_handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, file_handler)
+    listener.start()
+    # Flush queued records on exit
+    atexit.register(listener.stop)
+
+    logger = logging.getLogger("squad_queue_monitor")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(QueueHandler(records))
+    return logger
@@ -0,0 +1,110 @@
+import tkinter as tk
+from tkinter import ttk, font as tkfont
+from log_buffer import format_entry
+
+
+class LogView(ttk.Frame):
+    """
+    Log viewer over a LogBuffer that only ever holds the visible lines in its Text widget,
+    so drawing and scrolling cost the same for ten entries or ten thousand.
+    Follows new entries while scrolled to the bottom. The search box filters entries
+    through the buffer's word index.
+    """
+
+    def __init__(self, parent, buffer, height=12, search_label=""):
+        super().__init__(parent)
+        self.buffer = buffer
+        self.height = height
+        self.offset = 0
+        self.follow = True
+        self.matches = None
+        self.rendered = None
+
+        search_frame = ttk.Frame(self)
+        search_frame.pack(fill="x", padx=10, pady=(5, 0))
+        self.search_label = ttk.Label(search_frame, text=search_label)
+        self.search_label.pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *_: self.refresh(search=True))
+        ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, fill="x", expand=True, padx=5)
+
+        text_frame = ttk.Frame(self)
+        text_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.scrollbar = ttk.Scrollbar(text_frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.text = tk.Text(text_frame, wrap=tk.NONE, width=50, height=height, state=tk.DISABLED)
+        self.text.pack(side=tk.LEFT, fill="both", expand=True)
+        self.line_height = tkfont.Font(font=self.text["font"]).metrics("linespace")
+
+        self.text.bind("<Configure>", self.on_resize)
+        self.text.bind("<MouseWheel>", lambda event: self.scroll_lines(-1 if event.delta > 0 else 1))
+        self.text.bind("<Button-4>", lambda event: self.scroll_lines(-1))
+        self.text.bind("<Button-5>", lambda event: self.scroll_lines(1))
+
+    def set_search_label(self, text):
+        self.search_label.config(text=text)
+
+    def row_count(self):
+        return len(self.buffer) if self.matches is None else len(self.matches)
+
+    def refresh(self, search=False):
+        """
+        Redraw after the buffer or the search changed
+        """
+        query = self.search_var.get()
+        if search or (query and self.buffer.version != self.rendered_version()):
+            self.matches = self.buffer.search(query)
+        if search:
+            self.follow = True
+        self.render()
+
+    def rendered_version(self):
+        return self.rendered[0] if self.rendered else None
+
+    def render(self):
+        rows = self.row_count()
+        if self.follow:
+            self.offset = max(0, rows - self.height)
+        self.offset = max(0, min(self.offset, rows - self.height))
+
+        state = (self.buffer.version, self.offset, self.height, self.search_var.get())
+        if state == self.rendered:
+            return
+        self.rendered = state
+
+        end = min(rows, self.offset + self.height)
+        lines = []
+        for row in range(self.offset, end):
+            position = row if self.matches is None else self.matches[row]
+            lines.append(format_entry(*self.buffer.get(position)))
+
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        self.text.config(state=tk.DISABLED)
+
+        if rows > self.height:
+            self.scrollbar.set(self.offset / rows, end / rows)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_lines(self, lines):
+        self.offset += lines
+        self.follow = self.offset + self.height >= self.row_count()
+        self.render()
+        return "break"
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.offset = int(float(value) * self.row_count())
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self.offset += int(value) * step
+        self.follow = self.offset + self.height >= self.row_count()
+        self.render()
+
+    def on_resize(self, event):
+        height = max(1, event.height // self.line_height)
+        if height != self.height:
+            self.height = height
+            self.render()
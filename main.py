@@ -1,8 +1,7 @@
+import argparse
 import os
 import sys
-import tkinter as tk
-from ui import SquadQueueMonitorUI
-from language import get_text
+import multiprocessing
 
 
 def main():
@@ -14,6 +13,10 @@ def main():
     os.makedirs("debug", exist_ok=True)
     os.makedirs("assets", exist_ok=True)
 
+    # Tkinter is only imported for the windowed mode
+    import tkinter as tk
+    from ui import SquadQueueMonitorUI
+
     # Create root window
     root = tk.Tk()
     app = SquadQueueMonitorUI(root)
@@ -22,8 +25,28 @@ def main():
     root.mainloop()
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Squad Queue Monitor")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without a window, writing status events to stdout as JSON lines")
+    parser.add_argument("--backend", choices=["auto", "window", "screen", "replay"],
+                        help="Capture backend (headless mode, default from config)")
+    parser.add_argument("--replay-source", help="Image, image directory or video to replay (headless mode)")
+    parser.add_argument("--replay-fps", type=float, default=0, help="Replay frame rate, 0 - one frame per check")
+    parser.add_argument("--multi-target", action="store_true", help="Monitor every running game client")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after this many seconds (0 - run until stopped)")
+    parser.add_argument("--no-notify", action="store_true", help="Do not play sounds or show toasts")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    # Needed for OCR worker processes in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+    args = parse_args()
     try:
+        if args.headless:
+            from headless import run_headless
+            sys.exit(run_headless(args))
         main()
     except Exception as e:
         print(f"Unhandled exception: {e}")
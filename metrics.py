@@ -0,0 +1,90 @@
+import threading
+import time
+from array import array
+
+HISTORY_SIZE = 512  # Latency samples kept per stage
+
+
+class LatencyHistory:
+    """
+    Rolling window of latencies for one stage; recording is O(1) and allocation-free,
+    statistics are only computed when someone looks at them
+    """
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = size
+        self.values = array("d", [0.0]) * size
+        self.index = 0
+        self.count = 0
+        self.last = 0.0
+
+    def record(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        self.last = value
+
+    def summary(self):
+        """
+        Returns: (last, mean, p95, max) over the window
+        """
+        if not self.count:
+            return 0.0, 0.0, 0.0, 0.0
+        values = sorted(self.values[:self.count])
+        p95 = values[min(self.count - 1, int(self.count * 0.95))]
+        return self.last, sum(values) / self.count, p95, values[-1]
+
+
+class StageTimer:
+    """
+    Context manager that records the duration of a block into a StageMetrics stage
+    """
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.record(self.stage, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class StageMetrics:
+    """
+    Per-stage latency histories, in milliseconds
+    """
+
+    def __init__(self):
+        self.histories = {}
+        self.lock = threading.Lock()
+
+    def time(self, stage):
+        """
+        Time a block: with metrics.time("capture_window"): ...
+        """
+        return StageTimer(self, stage)
+
+    def record(self, stage, milliseconds):
+        with self.lock:
+            history = self.histories.get(stage)
+            if history is None:
+                history = self.histories[stage] = LatencyHistory()
+            history.record(milliseconds)
+
+    def reset(self):
+        with self.lock:
+            self.histories.clear()
+
+    def get_summary(self):
+        """
+        Returns: list of (stage, last, mean, p95, max), in the order stages were first seen
+        """
+        with self.lock:
+            return [(stage,) + history.summary() for stage, history in self.histories.items()]
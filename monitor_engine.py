@@ -0,0 +1,403 @@
+import threading
+import time
+from config import (
+    GAME_WINDOW_TITLE, OCR_EXECUTION_MODE, OCR_POOL_SIZE, OCR_WORKERS, MULTI_TARGET_MODE,
+    CAPTURE_QUEUE_PANEL_ONLY, FULL_CAPTURE_INTERVAL
+)
+from screen_capture import GameLocator, capture_window_handle
+from ocr_processor import create_queue_cascade
+from roi import QueueRegionLocator, crop_region
+from digit_recognizer import DigitRecognizer
+from scheduler import PollScheduler
+from eta import QueueEtaEstimator
+from capture_backends import create_capture_backend
+from metrics import StageMetrics
+from pipeline import CapturePipeline
+from multi_target import MultiTargetMonitor
+from change_detection import FrameChangeDetector, FRAME_BLACK, FRAME_UNCHANGED
+from debug_recorder import DebugFrameRecorder
+from queue_state import QueueStateMachine, QueueTransition, STATE_QUEUED
+from events import (
+    EVENT_STARTED, EVENT_STOPPED, EVENT_GAME, EVENT_STATUS, EVENT_ENTERED, EVENT_TARGET_ADDED,
+    EVENT_TARGET_REMOVED, EVENT_ERROR
+)
+
+
+class MonitorEngine:
+    """
+    Queue monitoring core shared by the Tk UI and the headless entry point: capture, change
+    detection, OCR cascade, queue state, ETA and notifications. Reports what happens as event
+    dicts ({"event": type, "time": timestamp, ...}) to on_event, called from worker threads.
+    """
+
+    def __init__(self, on_event=None, capture_backend=None, multi_target=MULTI_TARGET_MODE, notify=True,
+                 stage_metrics=None):
+        self.on_event = on_event or (lambda event: None)
+        self.multi_target = multi_target
+        self.notify = notify
+
+        # Monitoring state
+        self.pipeline = None
+        self.last_location = None
+        self.screen_size = None
+        self.save_screenshots = False
+
+        # Game process and window, cached between checks and shared by all callers
+        self.game_locator = GameLocator()
+
+        # Frame source (game window, full screen or replay), selected by CAPTURE_BACKEND
+        self.capture_backend = capture_backend or create_capture_backend(locator=self.game_locator)
+
+        # Per-stage latency histories (may be shared with the UI, which creates them before the engine)
+        self.stage_metrics = stage_metrics or StageMetrics()
+
+        # Cached queue panel region, so monitoring OCRs only that part of the frame
+        self.region_locator = QueueRegionLocator()
+
+        # Reads the queue numbers from the region without Tesseract once glyphs are learned
+        self.digit_recognizer = DigitRecognizer()
+
+        # Cheap OCR stages first, heavier ones only when the cheap result is doubtful
+        self.ocr_cascade = create_queue_cascade(self.region_locator, self.digit_recognizer, self.stage_metrics)
+
+        # Worker process pool running the cascade when OCR_EXECUTION_MODE is "process" (created on first start)
+        self.ocr_executor = None
+
+        # Picks the next check time from queue position and movement
+        self.poll_scheduler = PollScheduler()
+
+        # Estimates time until entering the server from queue position history
+        self.eta_estimator = QueueEtaEstimator()
+
+        # Queue state (NoGame -> Menu -> Queued -> Loading -> InGame) and the last ETA reported with it
+        self.queue_state = QueueStateMachine()
+        self.last_eta = None
+
+        # Frame change detection - unchanged frames reuse the previous OCR result
+        self.change_detector = FrameChangeDetector()
+        self.last_result = None
+
+        # Full frame size and whether the next capture has to be a full frame (see capture_region)
+        self.frame_shape = None
+        self.full_capture_due = True
+        self.panel_captures = 0
+
+        # Recent frames for debugging, written in the background when saving screenshots is enabled
+        self.debug_recorder = DebugFrameRecorder()
+
+    def emit(self, event, **fields):
+        data = {"event": event, "time": time.time()}
+        data.update(fields)
+        self.on_event(data)
+
+    def is_running(self):
+        return self.pipeline is not None
+
+    def start(self):
+        """
+        Start monitoring in background capture and OCR threads.
+        Capture runs on its own thread and feeds OCR workers through a bounded queue
+        that drops stale frames, so a slow OCR call never delays the next capture.
+        """
+        if self.pipeline is not None:
+            return
+
+        self.stage_metrics.reset()
+        self.change_detector.reset()
+        self.poll_scheduler.reset()
+        self.eta_estimator.reset()
+        self.last_result = None
+        self.queue_state.reset()
+        self.last_eta = None
+        self.last_location = None
+
+        workers = OCR_WORKERS
+        if OCR_EXECUTION_MODE == "process":
+            if self.ocr_executor is None:
+                from ocr_pool import ProcessOcrExecutor
+                # Workers get the learned panel regions and digit templates with each frame; only this process saves them
+                self.ocr_executor = ProcessOcrExecutor(locator=self.region_locator, recognizer=self.digit_recognizer)
+            # One submitting thread per worker process
+            workers = OCR_POOL_SIZE
+
+        if self.multi_target:
+            # Every game client, captured in turn and recognized by one shared pool of workers
+            self.pipeline = MultiTargetMonitor(
+                self.game_locator,
+                capture=self.capture_target_frame,
+                process=lambda target, frame: self.process_frame(frame, target),
+                on_result=self.handle_target_result,
+                on_targets_changed=self.handle_targets_changed,
+                get_bounds=lambda: (self.poll_scheduler.base_interval, self.poll_scheduler.min_interval,
+                                    self.poll_scheduler.max_interval),
+                workers=workers,
+                on_error=self.handle_error,
+                release=self.capture_backend.release
+            )
+        else:
+            self.pipeline = CapturePipeline(
+                capture=self.capture_frame,
+                process=self.process_frame,
+                on_result=self.handle_frame_result,
+                next_interval=lambda: self.poll_scheduler.next_interval(
+                    self.queue_state.position, self.eta_estimator.get_rate()
+                ),
+                workers=workers,
+                on_error=self.handle_error,
+                release=self.capture_backend.release
+            )
+        self.pipeline.start()
+        self.emit(EVENT_STARTED, backend=self.capture_backend.name, multi_target=self.multi_target)
+
+    def stop(self):
+        """
+        Stop monitoring
+        """
+        if self.pipeline is None:
+            return
+        self.pipeline.stop()
+        self.pipeline = None
+        self.emit(EVENT_STOPPED)
+
+    def close(self):
+        """
+        Stop monitoring and release the capture backend and OCR worker processes
+        """
+        self.stop()
+        self.debug_recorder.close()
+        self.capture_backend.close()
+        if self.ocr_executor is not None:
+            self.ocr_executor.close()
+            self.ocr_executor = None
+
+    def handle_error(self, error):
+        """
+        Report an error from the capture thread or an OCR worker
+        """
+        self.emit(EVENT_ERROR, message=str(error))
+
+    def capture_frame(self):
+        """
+        Update game window status and capture a frame (runs on the capture thread)
+        """
+        # Replayed frames do not come from the game - no need to look for it
+        if self.capture_backend.name != "replay":
+            # Check if game is running (cached process and window, full scan only when they are gone)
+            with self.stage_metrics.time("locate_game"):
+                location = self.game_locator.locate()
+            if location != self.last_location:
+                self.last_location = location
+                # Window changed - the panel region may not apply to the new frames
+                self.full_capture_due = True
+                self.emit(EVENT_GAME, process_name=location.process_name, pid=location.pid,
+                          hwnd=location.hwnd, title=location.title)
+                transition = self.queue_state.game_found(location.pid is not None, time.time())
+                if transition is not None:
+                    self.emit_status(self, transition)
+
+        # Capture frame (game window with full screen fallback, unless configured otherwise)
+        return self.grab(self, lambda region: self.capture_backend.capture(GAME_WINDOW_TITLE, region))
+
+    def capture_target_frame(self, target):
+        """
+        Capture the window of one game client (runs on the multi-target scheduler thread)
+        """
+        if not target.location.hwnd:
+            return None
+        backend = self.capture_backend
+        return self.grab(target, lambda region: capture_window_handle(
+            target.location.hwnd, backend.gray, backend.pool, region
+        ))
+
+    def capture_region(self, state):
+        """
+        Part of the frame to grab: the located queue panel, except for every FULL_CAPTURE_INTERVAL-th
+        capture and after a panel capture that could not be read
+        Returns: region or None for a full capture
+        """
+        if (not CAPTURE_QUEUE_PANEL_ONLY or state.full_capture_due or state.frame_shape is None
+                or state.panel_captures >= FULL_CAPTURE_INTERVAL):
+            return None
+        return self.region_locator.get_region(state.frame_shape, self.screen_size)
+
+    def grab(self, state, capture):
+        """
+        Capture the queue panel or the full frame with capture(region)
+        Returns: image of a full frame, (image, region) for a panel capture, or None
+        """
+        region = self.capture_region(state)
+        stage = "capture_window" if region is None else "capture_region"
+        with self.stage_metrics.time(stage):
+            image = capture(region)
+        if image is None:
+            if region is not None:
+                # No panel capture (e.g. the region no longer fits the window) - locate it on a full frame
+                state.full_capture_due = True
+            return None
+        if region is None:
+            state.frame_shape = image.shape
+            state.full_capture_due = False
+            state.panel_captures = 0
+            return image
+        state.panel_captures += 1
+        return image, region
+
+    def process_frame(self, frame, state=None):
+        """
+        Recognize queue status on a captured frame (runs on an OCR worker thread)
+        state: MonitorTarget in multi-target mode; holds change_detector and last_result
+        Returns: (processed, text, (in_queue, position, total)) or None for black frames
+        and unreadable panel captures
+        """
+        state = state or self
+        screenshot = frame.image
+
+        # Compare with the previous frame (queue panel region only, when located)
+        if frame.region is not None:
+            # Panel capture - the image is the region
+            frame_shape = state.frame_shape
+            region = None
+        else:
+            frame_shape = None
+            region = self.region_locator.get_region(screenshot.shape, self.screen_size)
+        with self.stage_metrics.time("change_detection"):
+            frame_state = state.change_detector.check(
+                crop_region(screenshot, region) if region is not None else screenshot
+            )
+
+        # Black frame (minimized window) - nothing to recognize
+        if frame_state == FRAME_BLACK:
+            return None
+
+        last_result = state.last_result
+        if frame_state == FRAME_UNCHANGED and last_result is not None:
+            # Screen has not changed - reuse previous result
+            return last_result
+
+        # Preprocess, recognize and analyze through the OCR cascade
+        save_screenshots = self.save_screenshots
+        if self.ocr_executor is not None and OCR_EXECUTION_MODE == "process":
+            result = self.run_ocr_in_process(screenshot, save_screenshots, frame_shape)
+        else:
+            result = self.ocr_cascade.run(screenshot, self.screen_size, frame_shape)
+
+        if frame_shape is not None and result.status[1] is None:
+            # Panel not readable (moved, or left the queue) - decide on a full frame, captured next
+            state.full_capture_due = True
+            return None
+        state.last_result = (result.processed, result.text, result.status)
+
+        # Debug: keep the frame and write it in the background if enabled
+        if save_screenshots:
+            self.debug_recorder.record(
+                screenshot, result.processed, result.text, result.status,
+                None if frame_shape is not None else self.region_locator.get_region(screenshot.shape, self.screen_size)
+            )
+
+        return state.last_result
+
+    def run_ocr_in_process(self, screenshot, return_processed, frame_shape=None):
+        """
+        Run the OCR cascade in a worker process and merge its region, learned digit templates
+        and stage stats back
+        Returns: PoolResult
+        """
+        with self.stage_metrics.time("ocr_process"):
+            result = self.ocr_executor.run(screenshot, self.screen_size, return_processed=return_processed,
+                                           frame_shape=frame_shape)
+        if result.region is not None:
+            self.region_locator.set_region(screenshot.shape, self.screen_size, result.region)
+        if result.learned is not None:
+            self.digit_recognizer.learn(*result.learned)
+        self.ocr_cascade.record_run(result.timings)
+        return result
+
+    def update_queue_state(self, state, frame_result):
+        """
+        Record a recognized frame in the queue state (the engine itself or a MonitorTarget)
+        Returns: QueueTransition, or None when the state and queue numbers did not change
+        """
+        processed, text, (in_queue, position, total) = frame_result.data
+        self.stage_metrics.record("frame_age", frame_result.age * 1000)
+
+        captured_at = frame_result.captured_at
+        state.poll_scheduler.record(captured_at, position)
+        state.eta_estimator.add_sample(captured_at, position, total)
+
+        transition = state.queue_state.update(in_queue, position, total, captured_at)
+        if transition is not None and transition.entered:
+            state.eta_estimator.reset()
+        return transition
+
+    def emit_status(self, state, transition, frame_result=None):
+        """
+        Report the queue state (of the engine itself or a MonitorTarget), with the ETA while the
+        position is known, when the state, the queue numbers or the ETA changed (transition is None
+        when only the ETA may have)
+        """
+        queue_state = state.queue_state
+        eta_minutes = None
+        if queue_state.position is not None:
+            eta_minutes = state.eta_estimator.eta_minutes(time.time())
+        if transition is None:
+            if eta_minutes == state.last_eta:
+                return
+            transition = QueueTransition(queue_state.state, queue_state.state, queue_state.position, queue_state.total)
+        state.last_eta = eta_minutes
+
+        frame_age_ms = round(frame_result.age * 1000, 1) if frame_result is not None else None
+        target, label = (None, None) if state is self else (state.key, state.label())
+        self.emit(EVENT_STATUS, target=target, label=label, state=transition.state, previous=transition.previous,
+                  in_queue=transition.state == STATE_QUEUED, position=transition.position, total=transition.total,
+                  eta_minutes=eta_minutes, frame_age_ms=frame_age_ms)
+
+    def send_entered_notification(self, message=None):
+        """
+        Send the "entered server" notification (runs on its own thread)
+        """
+        from notification import send_notification
+        with self.stage_metrics.time("notification"):
+            send_notification(message)
+
+    def handle_frame_result(self, frame_result):
+        """
+        Update queue state from the newest recognized frame (called for one result at a time)
+        """
+        transition = self.update_queue_state(self, frame_result)
+
+        if transition is not None and transition.entered:
+            if self.notify:
+                # The toast takes seconds - send it without holding up the OCR worker and the result lock
+                threading.Thread(target=self.send_entered_notification, daemon=True).start()
+            self.debug_recorder.dump("entered_server")
+            self.emit(EVENT_ENTERED, target=None)
+
+        self.emit_status(self, transition, frame_result)
+
+    def handle_target_result(self, target, frame_result):
+        """
+        Update the queue state of one game client (multi-target mode, runs on an OCR worker thread)
+        """
+        transition = self.update_queue_state(target, frame_result)
+
+        if transition is not None and transition.entered:
+            if self.notify:
+                from language import get_text
+                # Notify without holding up the OCR workers shared by all clients
+                threading.Thread(
+                    target=self.send_entered_notification,
+                    args=(f"{target.label()}: {get_text('entered_server')}",), daemon=True
+                ).start()
+            self.debug_recorder.dump(f"entered_server_{target.key}")
+            self.emit(EVENT_ENTERED, target=target.key, label=target.label())
+
+        self.emit_status(target, transition, frame_result)
+
+    def handle_targets_changed(self, added, removed):
+        """
+        Report started and exited game clients (multi-target mode)
+        """
+        for target in added:
+            self.emit(EVENT_TARGET_ADDED, target=target.key, label=target.label(), title=target.location.title)
+        for target in removed:
+            self.emit(EVENT_TARGET_REMOVED, target=target.key, label=target.label())
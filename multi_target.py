@@ -0,0 +1,196 @@
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import OCR_WORKERS, MULTI_TARGET_STAGGER, TARGET_DISCOVERY_INTERVAL
+from change_detection import FrameChangeDetector
+from eta import QueueEtaEstimator
+from queue_state import QueueStateMachine
+from pipeline import Frame, FrameResult
+from scheduler import PollScheduler
+
+
+class MonitorTarget:
+    """
+    Queue state of one game client: its window, poll schedule, ETA estimate and last result
+    """
+
+    def __init__(self, location, bounds=None):
+        self.key = location.pid
+        self.location = location
+        self.poll_scheduler = PollScheduler(*bounds) if bounds else PollScheduler()
+        self.eta_estimator = QueueEtaEstimator()
+        self.change_detector = FrameChangeDetector()
+        self.last_result = None
+        # Full frame size and whether the next capture has to be a full frame (see MonitorEngine.capture_region)
+        self.frame_shape = None
+        self.full_capture_due = True
+        self.panel_captures = 0
+        self.queue_state = QueueStateMachine()
+        self.last_eta = None
+        self.status = None
+        self.seq = 0
+        self.due = 0.0
+        # A frame of this target is being recognized - new frames are dropped until it is done
+        self.busy = False
+
+    def label(self):
+        """
+        Short description of the client for logs and notifications
+        """
+        location = self.location
+        return f"{location.process_name} #{location.pid}"
+
+    def next_interval(self):
+        return self.poll_scheduler.next_interval(self.queue_state.position, self.eta_estimator.get_rate())
+
+
+class MultiTargetMonitor:
+    """
+    Monitors every running game client at once. One scheduler thread captures each client
+    when its own poll interval is due, keeping at least `stagger` seconds between captures,
+    and a single shared pool of OCR workers recognizes the frames of all clients.
+
+    capture(target): returns an image, an (image, region) pair or None, runs on the scheduler thread
+    process(target, frame): returns result data or None to skip, runs on a worker thread
+    on_result(target, FrameResult): called for each recognized frame
+    on_targets_changed(added, removed): called when clients start or exit
+    get_bounds(): (base, min, max) poll intervals for new targets
+    release(image): called once a captured image is no longer needed
+    """
+
+    def __init__(self, locator, capture, process, on_result, on_targets_changed=None,
+                 get_bounds=None, workers=OCR_WORKERS, stagger=MULTI_TARGET_STAGGER,
+                 discovery_interval=TARGET_DISCOVERY_INTERVAL, on_error=None, release=None):
+        self.locator = locator
+        self.capture = capture
+        self.process = process
+        self.on_result = on_result
+        self.release = release or (lambda image: None)
+        self.on_targets_changed = on_targets_changed or (lambda added, removed: None)
+        self.get_bounds = get_bounds or (lambda: None)
+        self.on_error = on_error or (lambda e: print(f"Error in multi-target monitor: {e}"))
+        self.stagger = stagger
+        self.discovery_interval = discovery_interval
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.targets = {}
+        self.schedule = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.dropped = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+        self.executor.shutdown(wait=False)
+
+    def is_running(self):
+        return not self.stop_event.is_set()
+
+    def get_targets(self):
+        """
+        Returns: list of MonitorTarget, ordered by pid
+        """
+        with self.lock:
+            return [self.targets[key] for key in sorted(self.targets)]
+
+    def discover(self):
+        """
+        Add newly started clients (due immediately) and drop the ones that exited
+        """
+        locations = {location.pid: location for location in self.locator.locate_all()}
+        added = []
+        with self.lock:
+            removed = [self.targets.pop(key) for key in list(self.targets) if key not in locations]
+            for key, location in locations.items():
+                target = self.targets.get(key)
+                if target is not None:
+                    target.location = location
+                    continue
+                target = self.targets[key] = MonitorTarget(location, self.get_bounds())
+                target.due = time.time()
+                heapq.heappush(self.schedule, (target.due, key))
+                added.append(target)
+        if added or removed:
+            self.on_targets_changed(added, removed)
+
+    def run(self):
+        next_discovery = 0.0
+        last_capture = 0.0
+        while not self.stop_event.is_set():
+            now = time.time()
+            if now >= next_discovery:
+                try:
+                    self.discover()
+                except Exception as e:
+                    self.on_error(e)
+                next_discovery = now + self.discovery_interval
+
+            with self.lock:
+                due_at, key = self.schedule[0] if self.schedule else (next_discovery, None)
+
+            # Spread captures of different clients instead of taking them all at once
+            wait = min(max(due_at, last_capture + self.stagger), next_discovery) - now
+            if key is None or wait > 0:
+                self.wake_event.wait(max(wait, 0))
+                self.wake_event.clear()
+                continue
+
+            with self.lock:
+                heapq.heappop(self.schedule)
+                target = self.targets.get(key)
+                # Entry of a client that has exited (or was re-added since)
+                if target is None or target.due != due_at:
+                    continue
+
+            last_capture = time.time()
+            try:
+                self.capture_target(target)
+            except Exception as e:
+                self.on_error(e)
+
+            with self.lock:
+                target.due = last_capture + target.next_interval()
+                heapq.heappush(self.schedule, (target.due, key))
+
+    def capture_target(self, target):
+        """
+        Capture a frame of target and hand it to the shared OCR workers
+        """
+        if target.busy:
+            # Previous frame still being recognized - skip this one rather than queue up
+            self.dropped += 1
+            return
+
+        image = self.capture(target)
+        if image is None:
+            return
+
+        image, region = image if isinstance(image, tuple) else (image, None)
+        frame = Frame(target.seq, image, time.time(), region)
+        target.seq += 1
+        target.busy = True
+        try:
+            self.executor.submit(self.process_target, target, frame)
+        except RuntimeError:
+            # Executor already shut down by stop()
+            target.busy = False
+            self.release(image)
+
+    def process_target(self, target, frame):
+        try:
+            data = self.process(target, frame)
+            if data is not None and not self.stop_event.is_set():
+                self.on_result(target, FrameResult(frame.seq, frame.captured_at,
+                                                   time.time() - frame.captured_at, data))
+        except Exception as e:
+            self.on_error(e)
+        finally:
+            self.release(frame.image)
+            target.busy = False
@@ -12,16 +12,26 @@ except ImportError:
 # Try to import win10toast for Windows notifications
 try:
     from win10toast import ToastNotifier
-    toaster = ToastNotifier()
     toast_available = True
 except ImportError:
     print("WARNING: win10toast module not available. Toast notifications disabled.")
     toast_available = False
 
+# Created on the first notification - most sessions never show one
+_toaster = None
 
-def send_notification():
+
+def get_toaster():
+    global _toaster
+    if _toaster is None:
+        _toaster = ToastNotifier()
+    return _toaster
+
+
+def send_notification(message=None):
     """
     Send notification that user has entered the server
+    message: toast text, defaults to the "entered server" text
     """
     try:
         # Sound notification if available
@@ -35,9 +45,9 @@ def send_notification():
 
         # Windows toast notification if available
         if toast_available:
-            toaster.show_toast(
+            get_toaster().show_toast(
                 "Squad Queue Monitor",
-                get_text("entered_server"),
+                message or get_text("entered_server"),
                 duration=10,
                 threaded=True  # Run in separate thread
             )
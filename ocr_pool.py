@@ -0,0 +1,217 @@
+import queue
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from config import OCR_POOL_SIZE, OCR_WORKER_MAX_TASKS
+from queue_patterns import get_queue_matcher, configure_queue_matcher
+
+# Result of OCR in a worker process; processed is only sent back when asked for.
+# learned: (queue panel crop, text) the worker learned digit templates from, for the parent to learn and save
+PoolResult = namedtuple("PoolResult", ["processed", "text", "status", "region", "timings", "learned"])
+
+
+class SharedFramePool:
+    """
+    Fixed set of reusable shared memory buffers for handing frames to worker processes.
+    A frame is copied once into a free buffer; workers map the same memory without copying.
+    """
+
+    def __init__(self, slots):
+        self.buffers = [None] * slots
+        self.free = queue.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+
+    def write(self, image):
+        """
+        Copy image into a free buffer, waiting for one if all are in use
+        Returns: (slot, shared memory name) - a slot gets a new name when its buffer is reallocated
+        """
+        slot = self.free.get()
+        buffer = self.buffers[slot]
+        if buffer is None or buffer.size < image.nbytes:
+            # First use or a larger frame than before - (re)allocate this buffer
+            if buffer is not None:
+                buffer.close()
+                buffer.unlink()
+            buffer = self.buffers[slot] = shared_memory.SharedMemory(create=True, size=image.nbytes)
+
+        view = np.ndarray(image.shape, dtype=image.dtype, buffer=buffer.buf)
+        view[...] = image
+        return slot, buffer.name
+
+    def release(self, slot):
+        self.free.put(slot)
+
+    def close(self):
+        for buffer in self.buffers:
+            if buffer is not None:
+                buffer.close()
+                buffer.unlink()
+        self.buffers = [None] * len(self.buffers)
+
+
+# Per worker process state
+_worker_cascade = None
+_worker_locator = None
+_worker_recognizer = None
+_worker_templates_version = None  # Version of the parent's digit templates this worker holds
+_worker_buffers = {}  # slot -> SharedMemory mapped by this worker
+
+
+def _init_worker():
+    """
+    Create this worker process' own OCR cascade (OCR engine, queue panel locator, digit templates).
+    Regions and templates come from the parent with each task; only the parent writes them to disk.
+    """
+    global _worker_cascade, _worker_locator, _worker_recognizer
+    from roi import QueueRegionLocator
+    from digit_recognizer import DigitRecognizer
+    from ocr_processor import create_queue_cascade
+    _worker_locator = QueueRegionLocator(cache_path=None)
+    _worker_recognizer = DigitRecognizer(templates_path=None)
+    _worker_cascade = create_queue_cascade(_worker_locator, _worker_recognizer)
+
+
+def _update_templates(templates):
+    """
+    Take over the parent's digit templates when they changed since this worker last saw them
+    templates: (version, source) - source is the parent's templates file, or (labels, vectors) when it keeps them in memory
+    """
+    global _worker_templates_version
+    version, source = templates
+    if version == _worker_templates_version:
+        return
+    if isinstance(source, str):
+        # The file holds at least this version - the parent only sends versions it has saved
+        _worker_recognizer.load(source)
+    else:
+        _worker_recognizer.set_templates(*source)
+    _worker_templates_version = version
+
+
+def _attach(slot, name):
+    """
+    Map the shared memory buffer of a slot, keeping it open for the next frames
+    """
+    buffer = _worker_buffers.get(slot)
+    if buffer is not None and buffer.name != name:
+        # The parent reallocated this slot - drop the stale mapping
+        buffer.close()
+        buffer = None
+    if buffer is None:
+        # Workers share the parent's resource tracker, which unlinks the buffer once the parent is done
+        buffer = _worker_buffers[slot] = shared_memory.SharedMemory(name=name)
+    return buffer
+
+
+def _process_shared_frame(slot, name, shape, dtype, screen_size, return_processed, preprocess_only,
+                          frame_shape=None, region=None, matcher_settings=None, templates=None):
+    """
+    Run OCR on a frame in shared memory (executed in a worker process)
+    region: queue panel region cached by the parent for this frame size; None drops the worker's own
+    matcher_settings: the parent's queue pattern settings, applied here when they changed
+    templates: the parent's digit templates, see _update_templates
+    """
+    if matcher_settings is not None and matcher_settings != get_queue_matcher().settings:
+        configure_queue_matcher(*matcher_settings)
+
+    image = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_attach(slot, name).buf)
+
+    if preprocess_only:
+        from preprocessing import default_preprocessor
+        default_preprocessor.run(image)
+        return PoolResult(None, "", (False, None, None), None, [], None)
+
+    if frame_shape is None:
+        # The parent's cache decides - a region it invalidated must not survive in this worker
+        if region is not None:
+            _worker_locator.set_region(shape, screen_size, region)
+        else:
+            _worker_locator.invalidate(shape, screen_size)
+    if templates is not None:
+        _update_templates(templates)
+    result, timings = _worker_cascade.run_with_timings(image, screen_size, frame_shape)
+    region = _worker_locator.get_region(shape, screen_size) if frame_shape is None else None
+
+    # The region stage learned digit templates from this read - let the parent learn and save them too
+    learned = None
+    if any(name == "region" and accepted for name, accepted, _ in timings) and result.status[1] is not None:
+        learned = (result.processed.copy(), result.text.strip())
+
+    processed = result.processed if return_processed and result.processed is not None else None
+    if processed is not None and processed.base is not None:
+        # Views into shared memory must not outlive this call
+        processed = processed.copy()
+    return PoolResult(processed, result.text, result.status, region, timings, learned)
+
+
+class ProcessOcrExecutor:
+    """
+    Runs the OCR cascade in a pool of worker processes, handing frames over through
+    SharedFramePool. Workers are replaced after max_tasks frames to keep memory in check.
+    locator/recognizer: the parent's queue panel locator and digit recognizer; their regions and templates
+    are sent along with each task, so recycled workers and templates learned later are always current
+    """
+
+    def __init__(self, workers=OCR_POOL_SIZE, max_tasks=OCR_WORKER_MAX_TASKS, locator=None, recognizer=None):
+        self.workers = workers
+        self.max_tasks = max_tasks
+        self.locator = locator
+        self.recognizer = recognizer
+        # One buffer being processed by each worker plus one being filled
+        self.frames = SharedFramePool(workers * 2)
+        self.lock = threading.Lock()
+        self.tasks = 0
+        self.executor = self._create_executor()
+
+    def _create_executor(self):
+        options = {"max_workers": self.workers, "initializer": _init_worker}
+        if self.max_tasks and sys.version_info >= (3, 11):
+            options["max_tasks_per_child"] = self.max_tasks
+        return ProcessPoolExecutor(**options)
+
+    def _get_executor(self):
+        with self.lock:
+            self.tasks += 1
+            # Before Python 3.11 workers cannot be recycled one by one - replace the whole pool
+            if (self.max_tasks and sys.version_info < (3, 11)
+                    and self.tasks > self.max_tasks * self.workers):
+                self.executor.shutdown(wait=False)
+                self.executor = self._create_executor()
+                self.tasks = 1
+            return self.executor
+
+    def run(self, image, screen_size=None, return_processed=False, preprocess_only=False, frame_shape=None):
+        """
+        OCR image in a worker process, blocking until the result is ready
+        frame_shape: see OcrCascade.run
+        Returns: PoolResult
+        """
+        region = None
+        if self.locator is not None and frame_shape is None:
+            region = self.locator.get_region(image.shape, screen_size)
+        templates = None
+        if self.recognizer is not None:
+            if self.recognizer.templates_path is not None:
+                templates = (self.recognizer.saved_version, self.recognizer.templates_path)
+            else:
+                templates = (self.recognizer.version, self.recognizer.get_templates())
+        slot, name = self.frames.write(image)
+        try:
+            future = self._get_executor().submit(
+                _process_shared_frame, slot, name, image.shape, image.dtype.str,
+                screen_size, return_processed, preprocess_only, frame_shape, region,
+                get_queue_matcher().settings, templates
+            )
+            return future.result()
+        finally:
+            self.frames.release(slot)
+
+    def close(self):
+        with self.lock:
+            self.executor.shutdown(wait=True)
+        self.frames.close()
@@ -2,13 +2,184 @@
 import pytesseract
 import re
 import os
-from config import TESSERACT_PATH, OCR_CONFIG, QUEUE_TEXT_PATTERN, IN_GAME_INDICATORS
+import threading
+import time
+from collections import namedtuple
+from config import (
+    TESSERACT_PATH, OCR_CONFIG, OCR_ENGINE, OCR_LANGUAGE, TESSDATA_PATH,
+    OCR_FAST_CONFIG, OCR_CONFIDENCE_THRESHOLD, DIGIT_MIN_CONFIDENCE
+)
+from digit_recognizer import DigitReading
+from queue_patterns import get_queue_matcher
+from roi import crop_region
+from preprocessing import default_preprocessor, adaptive_preprocessor
 
 # Set Tesseract executable path
 pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
 
+# Try to import tesserocr for the persistent in-process engine
+try:
+    import tesserocr
+    from PIL import Image
+    tesserocr_available = True
+except ImportError:
+    tesserocr_available = False
 
-def extract_text(image):
+
+class OcrEngine:
+    """
+    Base class for OCR engines
+    """
+    name = "base"
+
+    def image_to_string(self, image, config=None):
+        """
+        Recognize text in image
+        """
+        raise NotImplementedError
+
+    def image_to_data(self, image, config=None):
+        """
+        Recognize words in image
+        Returns: list of dicts with text, conf, left, top, width, height and line keys
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Release engine resources
+        """
+        pass
+
+
+class PytesseractEngine(OcrEngine):
+    """
+    Runs tesseract.exe through pytesseract - starts a new process and reloads the model on every call
+    """
+    name = "pytesseract"
+
+    def image_to_string(self, image, config=None):
+        return pytesseract.image_to_string(image, lang=OCR_LANGUAGE, config=config or OCR_CONFIG)
+
+    def image_to_data(self, image, config=None):
+        data = pytesseract.image_to_data(
+            image, lang=OCR_LANGUAGE, config=config or OCR_CONFIG, output_type=pytesseract.Output.DICT
+        )
+
+        words = []
+        for i, word in enumerate(data["text"]):
+            word = word.strip()
+            if not word:
+                continue
+            words.append({
+                "text": word,
+                "conf": float(data["conf"][i]),
+                "left": data["left"][i],
+                "top": data["top"][i],
+                "width": data["width"][i],
+                "height": data["height"][i],
+                # Words sharing this key were recognized on the same text line
+                "line": (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+            })
+        return words
+
+
+class TesserocrEngine(OcrEngine):
+    """
+    Keeps one Tesseract API handle (model loaded once) alive and reuses it for every call
+    """
+    name = "tesserocr"
+
+    def __init__(self):
+        self.api = tesserocr.PyTessBaseAPI(path=TESSDATA_PATH, lang=OCR_LANGUAGE)
+        # The API handle is not thread-safe
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _page_seg_mode(config):
+        """
+        Get page segmentation mode from a tesseract command line config ("--psm 6")
+        """
+        match = re.search(r"--psm\s+(\d+)", config or OCR_CONFIG)
+        return int(match.group(1)) if match else tesserocr.PSM.AUTO
+
+    def _set_image(self, image, config):
+        self.api.SetPageSegMode(self._page_seg_mode(config))
+        self.api.SetImage(image if isinstance(image, Image.Image) else Image.fromarray(image))
+
+    def image_to_string(self, image, config=None):
+        with self.lock:
+            self._set_image(image, config)
+            return self.api.GetUTF8Text()
+
+    def image_to_data(self, image, config=None):
+        with self.lock:
+            self._set_image(image, config)
+            self.api.Recognize()
+
+            words = []
+            block_num = par_num = line_num = 0
+            iterator = self.api.GetIterator()
+            level = tesserocr.RIL.WORD
+            for item in tesserocr.iterate_level(iterator, level):
+                if item.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                    block_num += 1
+                if item.IsAtBeginningOf(tesserocr.RIL.PARA):
+                    par_num += 1
+                if item.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line_num += 1
+
+                word = (item.GetUTF8Text(level) or "").strip()
+                box = item.BoundingBox(level)
+                if not word or box is None:
+                    continue
+                left, top, right, bottom = box
+                words.append({
+                    "text": word,
+                    "conf": float(item.Confidence(level)),
+                    "left": left,
+                    "top": top,
+                    "width": right - left,
+                    "height": bottom - top,
+                    "line": (block_num, par_num, line_num),
+                })
+            return words
+
+    def close(self):
+        with self.lock:
+            self.api.End()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def create_ocr_engine(name=OCR_ENGINE):
+    """
+    Create OCR engine by name, falling back to pytesseract if tesserocr is unavailable
+    """
+    if name in ("auto", "tesserocr") and tesserocr_available:
+        try:
+            return TesserocrEngine()
+        except Exception as e:
+            print(f"Error starting tesserocr engine, falling back to pytesseract: {e}")
+    elif name == "tesserocr":
+        print("WARNING: tesserocr module not available. Falling back to pytesseract.")
+    return PytesseractEngine()
+
+
+def get_ocr_engine():
+    """
+    Get the shared OCR engine, creating it on first use
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_ocr_engine()
+        return _engine
+
+
+def extract_text(image, config=None):
     """
     Extract text from processed image
     """
@@ -16,17 +187,57 @@ def extract_text(image):
         return ""
 
     try:
-        # Use pytesseract for text recognition
-        text = pytesseract.image_to_string(image, config=OCR_CONFIG)
-        return text
+        return get_ocr_engine().image_to_string(image, config)
     except Exception as e:
         print(f"Error recognizing text: {e}")
         return ""
 
 
+def extract_words(image, config=None):
+    """
+    Extract recognized words with their bounding boxes from processed image
+    Returns: list of dicts with text, conf, left, top, width, height and line keys
+    """
+    if image is None:
+        return []
+
+    try:
+        return get_ocr_engine().image_to_data(image, config)
+    except Exception as e:
+        print(f"Error recognizing words: {e}")
+        return []
+
+
+def words_to_text(words):
+    """
+    Join words from extract_words back into plain text, one line per text line
+    """
+    lines = []
+    current_line = None
+    for word in words:
+        if word["line"] != current_line:
+            lines.append([])
+            current_line = word["line"]
+        lines[-1].append(word["text"])
+    return "\n".join(" ".join(line) for line in lines)
+
+
+def scale_words(words, scale):
+    """
+    Word boxes from an image resized by scale, mapped back to the original image
+    """
+    if scale == 1.0:
+        return words
+    return [
+        dict(word, left=int(word["left"] / scale), top=int(word["top"] / scale),
+             width=int(word["width"] / scale), height=int(word["height"] / scale))
+        for word in words
+    ]
+
+
 def analyze_queue_status(text):
     """
-    Analyze text to determine queue position
+    Analyze text (or a DigitReading from digit_recognizer) to determine queue position
     Returns: (in_queue, position, total)
     where in_queue is a boolean value,
     position is current position (None if not in queue),
@@ -35,31 +246,214 @@ def analyze_queue_status(text):
     if not text:
         return False, None, None
 
-    # Check for key phrases in English (always use English for OCR detection)
-    queue_keywords = ["Position:", "Leave queue"]
-    has_queue_indicator = any(keyword in text for keyword in queue_keywords)
+    # Digit recognizer output already holds the numbers
+    if isinstance(text, DigitReading):
+        if text.position is not None and text.total is not None:
+            return True, text.position, text.total
+        return False, None, None
 
-    if has_queue_indicator:
-        # Try the pattern
-        match = re.search(QUEUE_TEXT_PATTERN, text)
-        if match:
-            try:
-                position = int(match.group(1))
-                total = int(match.group(2))
-                return True, position, total
-            except (ValueError, IndexError) as e:
-                print(f"Error analyzing queue text: {e}")
+    # Queue layouts, keywords and in-game indicators in one pass (English regardless of interface
+    # language); queue keywords without readable numbers still mean in queue
+    match = get_queue_matcher().match(text)
+    return match.in_queue, match.position, match.total
+
+
+# Result of one cascade stage; status is (in_queue, position, total), confidence is 0-1
+StageResult = namedtuple("StageResult", ["stage", "processed", "text", "status", "confidence"])
+
+
+def words_confidence(words, status):
+    """
+    Confidence (0-1) of a Tesseract result: the weakest number word for a queue read,
+    the mean word confidence otherwise, and 0 when the queue was seen but not parsed
+    """
+    in_queue, position, _ = status
+    if in_queue and position is None:
+        return 0.0
+
+    if position is not None:
+        words = [w for w in words if any(c.isdigit() for c in w["text"])]
+        return min((w["conf"] for w in words), default=0.0) / 100
+
+    confs = [w["conf"] for w in words if w["conf"] >= 0]
+    return sum(confs) / len(confs) / 100 if confs else 0.0
+
+
+def panel_confidence(confidence, status):
+    """
+    Confidence of a queue panel stage: a panel read is only trusted when it has a queue position -
+    anything else (garbled panel, panel moved or gone) escalates to full-frame OCR
+    """
+    return confidence if status[1] is not None else 0.0
+
+
+class OcrCascade:
+    """
+    Runs OCR stages from cheapest to heaviest, stopping at the first result whose
+    confidence reaches the stage threshold, and records per-stage hit rates and latencies
+    """
+
+    def __init__(self, stages):
+        # stages: list of (name, function(screenshot, screen_size, frame_shape) -> StageResult or None, threshold)
+        self.stages = stages
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clear per-stage statistics
+        """
+        with self.lock:
+            self.runs = 0
+            self.stats = {name: {"runs": 0, "hits": 0, "total_ms": 0.0, "last_ms": 0.0}
+                          for name, _, _ in self.stages}
+
+    def run(self, screenshot, screen_size=None, frame_shape=None):
+        """
+        Run stages until one is confident enough
+        frame_shape: set when screenshot is only the queue panel of a frame of this shape;
+        stages that need the whole frame are then skipped
+        Returns: StageResult of the accepted stage, or the most confident one if none was accepted
+        """
+        return self.run_with_timings(screenshot, screen_size, frame_shape)[0]
+
+    def run_with_timings(self, screenshot, screen_size=None, frame_shape=None):
+        """
+        Same as run, also returning the stages that ran
+        Returns: (StageResult, list of (name, accepted, elapsed_ms))
+        """
+        best = None
+        timings = []
+        for name, stage, threshold in self.stages:
+            start = time.perf_counter()
+            result = stage(screenshot, screen_size, frame_shape)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            # Stage not applicable (e.g. queue panel not located yet, or a whole-frame stage on a panel capture)
+            if result is None:
+                continue
+
+            accepted = result.confidence >= threshold
+            timings.append((name, accepted, elapsed_ms))
+
+            if best is None or result.confidence > best.confidence:
+                best = result
+            if accepted:
+                best = result
+                break
+
+        self.record_run(timings)
+
+        if best is None:
+            return StageResult(None, None, "", (False, None, None), 0.0), timings
+        return best, timings
+
+    def record_run(self, timings):
+        """
+        Add one cascade run to the statistics (also used for runs done in worker processes)
+        """
+        with self.lock:
+            self.runs += 1
+            for name, accepted, elapsed_ms in timings:
+                stage_stats = self.stats[name]
+                stage_stats["runs"] += 1
+                stage_stats["hits"] += accepted
+                stage_stats["total_ms"] += elapsed_ms
+                stage_stats["last_ms"] = elapsed_ms
+
+    def get_stats(self):
+        """
+        Returns: list of (name, runs, hit_rate, mean_ms, last_ms), in stage order
+        """
+        with self.lock:
+            stats = []
+            for name, _, _ in self.stages:
+                stage_stats = self.stats[name]
+                runs = stage_stats["runs"]
+                stats.append((
+                    name,
+                    runs,
+                    stage_stats["hits"] / runs if runs else 0.0,
+                    stage_stats["total_ms"] / runs if runs else 0.0,
+                    stage_stats["last_ms"],
+                ))
+            return stats
+
+
+def create_queue_cascade(locator, recognizer=None, metrics=None):
+    """
+    Build the queue reading cascade:
+    digits (template matching on the queue panel) -> region (fast Tesseract on the queue panel)
+    -> full_frame (Tesseract on the whole frame, re-locates the panel)
+    -> full_frame_adaptive (whole frame with adaptive thresholding)
+    metrics: optional StageMetrics that gets preprocess_image and extract_text timings
+    Processed images are Preprocessor buffers, valid until the next frame on the same thread.
+    """
+
+    def timed(stage, function, *args):
+        if metrics is None:
+            return function(*args)
+        with metrics.time(stage):
+            return function(*args)
+
+    def preprocess_panel(screenshot, screen_size, frame_shape):
+        """
+        Preprocessed queue panel - screenshot itself for a panel capture, else its cached region
+        Returns: processed image or None if the panel is not located yet
+        """
+        if frame_shape is None:
+            region = locator.get_region(screenshot.shape, screen_size)
+            if region is None:
+                return None
+            frame_shape = screenshot.shape
+            screenshot = crop_region(screenshot, region)
+        processed, _ = timed("preprocess_image", default_preprocessor.run, screenshot, frame_shape[0])
+        return processed
+
+    def read_digits(screenshot, screen_size, frame_shape):
+        if recognizer is None or not recognizer.is_trained():
+            return None
+        processed = preprocess_panel(screenshot, screen_size, frame_shape)
+        if processed is None:
+            return None
+        reading = timed("digit_recognizer", recognizer.read, processed)
+        status = analyze_queue_status(reading)
+        return StageResult("digits", processed, reading.text, status, panel_confidence(reading.confidence, status))
+
+    def read_region(screenshot, screen_size, frame_shape):
+        processed = preprocess_panel(screenshot, screen_size, frame_shape)
+        if processed is None:
+            return None
+        words = timed("extract_text", extract_words, processed, OCR_FAST_CONFIG)
+        text = words_to_text(words)
+        status = analyze_queue_status(text)
+        confidence = panel_confidence(words_confidence(words, status), status)
 
-        # If we found queue indicators but couldn't extract numbers, still consider in queue
-        return True, None, None
+        # Tesseract read the region - teach the recognizer these glyphs
+        if recognizer is not None and status[1] is not None and confidence >= OCR_CONFIDENCE_THRESHOLD:
+            recognizer.learn(processed, text.strip())
+        return StageResult("region", processed, text, status, confidence)
 
-    # Check if there are indicators that the user is already in the game
-    for indicator in IN_GAME_INDICATORS:
-        if indicator in text and not has_queue_indicator:
-            # If there's a game indicator but no queue indicators, user is in game
-            return False, None, None
+    def read_full_frame(name, preprocessor):
+        def stage(screenshot, screen_size, frame_shape):
+            if frame_shape is not None:
+                return None
+            processed, scale = timed("preprocess_image", preprocessor.run, screenshot)
+            words = timed("extract_text", extract_words, processed)
+            text = words_to_text(words)
+            status = analyze_queue_status(text)
+            if status[1] is not None:
+                # Word boxes are on the downscaled image - the region is cached in frame coordinates
+                locator.locate(scale_words(words, scale), screenshot.shape, screen_size)
+            return StageResult(name, processed, text, status, words_confidence(words, status))
+        return stage
 
-    return False, None, None
+    return OcrCascade([
+        ("digits", read_digits, DIGIT_MIN_CONFIDENCE),
+        ("region", read_region, OCR_CONFIDENCE_THRESHOLD),
+        ("full_frame", read_full_frame("full_frame", default_preprocessor), OCR_CONFIDENCE_THRESHOLD),
+        ("full_frame_adaptive", read_full_frame("full_frame_adaptive", adaptive_preprocessor), 0.0),
+    ])
 
 
 def test_regex(pattern, example_text):
@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import deque, namedtuple
+from config import OCR_WORKERS, FRAME_QUEUE_SIZE
+
+# Captured frame; seq increases with every capture. region: (left, top, width, height) of the
+# full frame that image covers when only part of it was grabbed, None for a full frame
+Frame = namedtuple("Frame", ["seq", "image", "captured_at", "region"], defaults=(None,))
+
+# OCR result for a frame; age is seconds from capture to result
+FrameResult = namedtuple("FrameResult", ["seq", "captured_at", "age", "data"])
+
+
+class FrameQueue:
+    """
+    Bounded frame queue that drops the oldest frames when full; consumers always
+    take the newest frame and discard the stale ones behind it.
+    release(image) is called for every frame dropped here.
+    """
+
+    def __init__(self, maxsize=FRAME_QUEUE_SIZE, release=None):
+        self.frames = deque(maxlen=maxsize)
+        self.release = release or (lambda image: None)
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, frame):
+        with self.condition:
+            if self.closed:
+                self.release(frame.image)
+                return
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1
+                self.release(self.frames[0].image)
+            self.frames.append(frame)
+            self.condition.notify()
+
+    def get_latest(self, timeout=None):
+        """
+        Take the newest frame, dropping older ones
+        Returns: Frame or None on timeout or when closed
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.frames or self.closed, timeout):
+                return None
+            if not self.frames:
+                return None
+            frame = self.frames.pop()
+            self.dropped += len(self.frames)
+            for stale in self.frames:
+                self.release(stale.image)
+            self.frames.clear()
+            return frame
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            for frame in self.frames:
+                self.release(frame.image)
+            self.frames.clear()
+            self.condition.notify_all()
+
+
+class CapturePipeline:
+    """
+    Capture thread producing timestamped frames into a FrameQueue, and OCR worker
+    threads consuming them. Results reach on_result in capture order; a result older
+    than one already delivered (from a slower worker) is discarded.
+
+    capture(): returns an image, an (image, region) pair for a partial capture, or None;
+    runs on the capture thread
+    process(frame): returns result data or None to skip, runs on a worker thread
+    on_result(FrameResult): called with the newest results only, one at a time
+    next_interval(): seconds to wait before the next capture
+    release(image): called once a captured image is no longer needed (processed or dropped)
+    """
+
+    def __init__(self, capture, process, on_result, next_interval, workers=OCR_WORKERS,
+                 queue_size=FRAME_QUEUE_SIZE, on_error=None, release=None):
+        self.capture = capture
+        self.process = process
+        self.on_result = on_result
+        self.next_interval = next_interval
+        self.on_error = on_error or (lambda e: print(f"Error in pipeline: {e}"))
+        self.release = release or (lambda image: None)
+        self.frames = FrameQueue(queue_size, self.release)
+        self.workers = workers
+        self.stop_event = threading.Event()
+        self.result_lock = threading.Lock()
+        self.last_seq = -1
+        self.threads = []
+
+    def start(self):
+        self.threads = [threading.Thread(target=self.capture_loop, daemon=True)]
+        self.threads += [threading.Thread(target=self.worker_loop, daemon=True) for _ in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.frames.close()
+
+    def is_running(self):
+        return not self.stop_event.is_set()
+
+    def capture_loop(self):
+        seq = 0
+        while not self.stop_event.is_set():
+            try:
+                image = self.capture()
+                if image is not None:
+                    image, region = image if isinstance(image, tuple) else (image, None)
+                    self.frames.put(Frame(seq, image, time.time(), region))
+                    seq += 1
+            except Exception as e:
+                self.on_error(e)
+            self.stop_event.wait(self.next_interval())
+
+    def worker_loop(self):
+        while not self.stop_event.is_set():
+            frame = self.frames.get_latest(timeout=1)
+            if frame is None:
+                continue
+            try:
+                data = self.process(frame)
+                if data is None:
+                    continue
+                with self.result_lock:
+                    # A newer frame was already handled by another worker
+                    if frame.seq <= self.last_seq or self.stop_event.is_set():
+                        continue
+                    self.last_seq = frame.seq
+                    self.on_result(FrameResult(frame.seq, frame.captured_at, time.time() - frame.captured_at, data))
+            except Exception as e:
+                self.on_error(e)
+            finally:
+                self.release(frame.image)
@@ -0,0 +1,133 @@
+import threading
+from collections import namedtuple
+import cv2
+import numpy as np
+from config import PREPROCESS_PROFILES, TEXT_COLOR_KEY
+
+# Preprocessing settings for one resolution:
+# scale - downscale factor applied first (1.0 - none)
+# color_key - keep only pixels within TEXT_COLOR_KEY before thresholding (queue panel crops only)
+# threshold - "otsu" (global) or "adaptive" (local mean)
+# morphology - opening kernel size joining broken strokes of the (dark) text (0 - off)
+PreprocessProfile = namedtuple("PreprocessProfile", ["scale", "color_key", "threshold", "morphology"])
+
+ADAPTIVE_BLOCK_SIZE = 31
+ADAPTIVE_OFFSET = -10
+MAX_BUFFER_SETS = 8  # Input shapes kept per thread (queue panel crops change size when the panel moves)
+
+
+def select_profile(frame_height, profiles=PREPROCESS_PROFILES):
+    """
+    Profile for the largest minimum height not above frame_height
+    """
+    height = max((h for h in profiles if h <= frame_height), default=min(profiles))
+    return PreprocessProfile(**profiles[height])
+
+
+class Preprocessor:
+    """
+    Turns a BGR image (full frame or queue panel crop) into a binary image with dark text on
+    a light background: downscale -> grayscale -> color key -> threshold -> morphology.
+    Color keying runs on queue panel crops only - on a full frame it costs more than all other
+    steps together, and busy full frames are left to the adaptive threshold stage.
+    Every step writes into buffers allocated once per input shape and reused on later calls,
+    so a tick allocates nothing. Buffers are per thread; the returned image is overwritten by
+    the next call on the same thread, so copy it to keep it.
+    """
+
+    def __init__(self, threshold=None, color_key=True, profiles=PREPROCESS_PROFILES, color_range=TEXT_COLOR_KEY):
+        # threshold/color_key override or disable the profile settings (e.g. the adaptive fallback stage)
+        self.threshold = threshold
+        self.color_key = color_key
+        self.profiles = profiles
+        self.color_range = tuple(np.array(bound, np.uint8) for bound in color_range)
+        self.local = threading.local()
+
+    def get_profile(self, frame_height):
+        profile = select_profile(frame_height, self.profiles)
+        return profile._replace(
+            threshold=self.threshold or profile.threshold,
+            color_key=profile.color_key and self.color_key,
+        )
+
+    def get_buffers(self, shape, profile):
+        """
+        Buffers for this input shape and profile, allocated on first use
+        """
+        cache = getattr(self.local, "buffers", None)
+        if cache is None:
+            cache = self.local.buffers = {}
+        key = (shape, profile)
+        buffers = cache.get(key)
+        if buffers is None:
+            if len(cache) >= MAX_BUFFER_SETS:
+                cache.clear()
+            height, width = shape[:2]
+            if profile.scale != 1.0:
+                width, height = max(1, round(width * profile.scale)), max(1, round(height * profile.scale))
+            downscale_color = profile.scale != 1.0 and len(shape) == 3
+            buffers = cache[key] = {
+                # Color keyed images are downscaled in color, the others after converting to grayscale
+                "small": np.empty((height, width, 3), np.uint8) if downscale_color and profile.color_key else None,
+                "full_gray": np.empty(shape[:2], np.uint8) if downscale_color and not profile.color_key else None,
+                "gray": np.empty((height, width), np.uint8),
+                "hsv": np.empty((height, width, 3), np.uint8) if profile.color_key else None,
+                "mask": np.empty((height, width), np.uint8) if profile.color_key else None,
+                "binary": np.empty((height, width), np.uint8),
+                "morphology": np.empty((height, width), np.uint8) if profile.morphology else None,
+                # Area averaging is fast for whole-number factors only
+                "interpolation": cv2.INTER_AREA if (1 / profile.scale).is_integer() else cv2.INTER_LINEAR,
+                "kernel": np.ones((profile.morphology, profile.morphology), np.uint8) if profile.morphology else None,
+            }
+        return buffers
+
+    def run(self, image, frame_height=None):
+        """
+        Preprocess image (BGR, or grayscale without color keying)
+        frame_height: height of the whole frame image was cropped from, selects the profile;
+        given for queue panel crops, which are the only images that are color keyed
+        Returns: (binary image, scale) - word coordinates on the result divided by scale
+        are coordinates on image
+        """
+        profile = self.get_profile(frame_height or image.shape[0])
+        if image.ndim == 2 or frame_height is None:
+            profile = profile._replace(color_key=False)
+        buffers = self.get_buffers(image.shape, profile)
+
+        gray = buffers["gray"]
+        if profile.color_key:
+            small = image
+            if buffers["small"] is not None:
+                small = buffers["small"]
+                cv2.resize(image, (small.shape[1], small.shape[0]), dst=small, interpolation=buffers["interpolation"])
+            cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=gray)
+            # Suppress everything that is not the text color, so the threshold only has to separate text
+            cv2.cvtColor(small, cv2.COLOR_BGR2HSV, dst=buffers["hsv"])
+            cv2.inRange(buffers["hsv"], self.color_range[0], self.color_range[1], dst=buffers["mask"])
+            cv2.bitwise_and(gray, buffers["mask"], dst=gray)
+        else:
+            if image.ndim == 3:
+                # Grayscale first, so only a third of the data is downscaled
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY,
+                                     dst=buffers["full_gray"] if profile.scale != 1.0 else gray)
+            if profile.scale != 1.0:
+                cv2.resize(image, (gray.shape[1], gray.shape[0]), dst=gray, interpolation=buffers["interpolation"])
+            else:
+                gray = image
+
+        binary = buffers["binary"]
+        if profile.threshold == "adaptive":
+            cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV,
+                                  ADAPTIVE_BLOCK_SIZE, ADAPTIVE_OFFSET, dst=binary)
+        else:
+            cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU, dst=binary)
+
+        if profile.morphology:
+            cv2.morphologyEx(binary, cv2.MORPH_OPEN, buffers["kernel"], dst=buffers["morphology"])
+            return buffers["morphology"], profile.scale
+        return binary, profile.scale
+
+
+# Shared by the OCR stages and worker threads - buffers are per thread
+default_preprocessor = Preprocessor()
+adaptive_preprocessor = Preprocessor(threshold="adaptive", color_key=False)
@@ -0,0 +1,69 @@
+import threading
+from collections import namedtuple
+
+# Latest probe results; version changes only when something in the snapshot changed
+ProbeSnapshot = namedtuple("ProbeSnapshot", ["version", "location", "screen_size"])
+
+
+class ProbeWorker:
+    """
+    Runs the periodic game process/window and screen resolution probes in a background
+    thread and publishes the results as a snapshot, so the Tk thread only reads them
+    """
+
+    def __init__(self, locator, interval=5):
+        self.locator = locator
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.snapshot = ProbeSnapshot(0, None, None)
+        self.thread = None
+
+    def start(self):
+        """
+        Start probing in a daemon thread
+        """
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+
+    def wake(self):
+        """
+        Probe now instead of waiting for the next interval
+        """
+        self.wake_event.set()
+
+    def get_snapshot(self):
+        with self.lock:
+            return self.snapshot
+
+    def probe(self):
+        """
+        Run all probes once and publish the results if they changed
+        """
+        location = self.locator.locate()
+        try:
+            import pyautogui
+            screen_size = tuple(pyautogui.size())
+        except Exception as e:
+            print(f"Error getting screen resolution: {e}")
+            screen_size = None
+
+        with self.lock:
+            if (location, screen_size) != (self.snapshot.location, self.snapshot.screen_size):
+                self.snapshot = ProbeSnapshot(self.snapshot.version + 1, location, screen_size)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.probe()
+            except Exception as e:
+                print(f"Error probing game window: {e}")
+            self.wake_event.wait(self.interval)
+            self.wake_event.clear()
@@ -0,0 +1,196 @@
+import re
+from collections import namedtuple
+from config import QUEUE_TEXT_PATTERN, QUEUE_LAYOUTS, QUEUE_KEYWORDS, IN_GAME_INDICATORS
+
+# Characters Tesseract commonly reads in place of digits
+DIGIT_CONFUSIONS = {
+    "O": "0", "o": "0", "D": "0", "Q": "0",
+    "I": "1", "l": "1", "i": "1", "!": "1",
+    "Z": "2", "z": "2",
+    "S": "5", "s": "5",
+    "G": "6", "b": "6",
+    "T": "7",
+    "B": "8",
+    "g": "9", "q": "9",
+}
+DIGIT_TRANSLATION = str.maketrans(DIGIT_CONFUSIONS)
+
+# Characters Tesseract commonly reads in place of letters (matched case-insensitively)
+LETTER_CONFUSIONS = {
+    "a": "a@4",
+    "b": "b68",
+    "e": "ec3",
+    "g": "g9",
+    "i": "il1|!",
+    "l": "li1|",
+    "o": "o0dq",
+    "s": "s5$",
+    "t": "t7+",
+    "u": "uv",
+    "z": "z2",
+}
+
+# A whole token of digits and digit look-alikes with at least one real digit ("1O" is 10, "GO" is not a number)
+NUMBER = r"(?-i:(?<!\w)(?=[^\s/|\\]*\d)[0-9" + re.escape("".join(DIGIT_CONFUSIONS)) + r"]{1,5}(?!\w))"
+SEPARATOR = r"\s*[/\\|]\s*"
+# A layout is the end of its text line ("Position 1 of 3 slides" is not a queue)
+LINE_END = r"(?![^\S\n]*[^\W\d_])"
+
+# Structured result of QueuePatternMatcher.match; spans are (start, end) in the text or None
+QueueMatch = namedtuple("QueueMatch", [
+    "in_queue", "position", "total", "layout", "span", "position_span", "total_span", "indicators"
+])
+
+NO_MATCH = QueueMatch(False, None, None, None, None, None, None, ())
+
+
+def fuzzy_literal(text):
+    """
+    Regex for literal text that tolerates OCR letter confusions, missing or extra
+    whitespace and a missing colon
+    """
+    parts = []
+    for char in text:
+        if char.isspace():
+            parts.append(r"\s*")
+        elif char.isalpha():
+            alternatives = LETTER_CONFUSIONS.get(char.lower(), char.lower())
+            parts.append("[" + re.escape(alternatives) + "]")
+        elif char in ":;":
+            parts.append(r"[:;.,]?")
+        elif char == "/":
+            parts.append(SEPARATOR)
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+def compile_layout(layout, name):
+    """
+    Regex for a layout such as "Position: {position} / {total}", with named number groups;
+    its words start and end on word boundaries ("Composition: 3 / 40" is not a queue)
+    """
+    parts = re.split(r"(\{position\}|\{total\})", layout)
+    pattern = r"\b" if layout[:1].isalpha() else ""
+    for part in parts:
+        if part == "{position}":
+            pattern += rf"(?P<{name}_position>{NUMBER})"
+        elif part == "{total}":
+            pattern += rf"(?P<{name}_total>{NUMBER})"
+        else:
+            pattern += fuzzy_literal(part)
+    if layout[-1:].isalpha():
+        pattern += r"\b"
+    return pattern + LINE_END
+
+
+def parse_number(token):
+    """
+    Integer from a number token read by OCR, or None
+    """
+    digits = token.translate(DIGIT_TRANSLATION)
+    return int(digits) if digits.isdigit() else None
+
+
+class QueuePatternMatcher:
+    """
+    Queue text layouts, queue keywords and in-game indicators compiled once into a single regex,
+    so the OCR text is scanned in one pass; the custom queue pattern is compiled on its own, as
+    written (its inline flags and groups are the user's), and takes precedence over the layouts.
+    Layouts tolerate common OCR mistakes ("Posltion", "1O / 2S"); keywords are matched literally.
+    """
+
+    def __init__(self, pattern=QUEUE_TEXT_PATTERN, layouts=QUEUE_LAYOUTS, keywords=QUEUE_KEYWORDS,
+                 indicators=IN_GAME_INDICATORS):
+        self.layouts = list(layouts)
+        self.indicators = list(indicators)
+        # configure_queue_matcher arguments that build this matcher (e.g. to rebuild it in OCR worker processes)
+        self.settings = (pattern, tuple(indicators), tuple(layouts), tuple(keywords))
+        alternatives = [f"(?P<layout{i}>{compile_layout(layout, f'layout{i}')})"
+                        for i, layout in enumerate(self.layouts)]
+
+        # The custom pattern is matched as written (case-sensitive); its groups 1 and 2 are position and total
+        self.custom_regex = None
+        if pattern:
+            custom_regex = re.compile(pattern)
+            if custom_regex.groups >= 2:
+                self.custom_regex = custom_regex
+
+        # Keywords alone mean in queue, so they are matched literally (case and colon included) - a fuzzy
+        # "position" would also be found in browsers, editors and chat on full-screen captures
+        alternatives += [f"(?P<keyword{i}>(?-i:{re.escape(keyword)}))" for i, keyword in enumerate(keywords)]
+        alternatives += [f"(?P<indicator{i}>{re.escape(indicator)})" for i, indicator in enumerate(self.indicators)]
+        self.regex = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def match_custom(self, text):
+        """
+        QueueMatch for the custom pattern with valid numbers, or None
+        """
+        if self.custom_regex is None:
+            return None
+        match = self.custom_regex.search(text)
+        if match is None or match.group(1) is None or match.group(2) is None:
+            return None
+        position, total = parse_number(match.group(1)), parse_number(match.group(2))
+        if position is None or total is None or not 0 < position <= total:
+            return None
+        return QueueMatch(True, position, total, "custom", match.span(), match.span(1), match.span(2), ())
+
+    def match(self, text):
+        """
+        Find the queue status in OCR text
+        Returns: QueueMatch - the custom pattern with valid numbers, else the first layout with them; a keyword or a layout
+        with unreadable numbers means in queue with unknown position
+        """
+        if not text:
+            return NO_MATCH
+
+        custom = self.match_custom(text)
+        queue_span = None
+        indicators = []
+        for match in self.regex.finditer(text):
+            kind = match.lastgroup
+            if kind.startswith("indicator"):
+                indicators.append((self.indicators[int(kind[9:])], match.span()))
+                continue
+            if kind.startswith("keyword"):
+                queue_span = queue_span or match.span()
+                continue
+
+            if custom is not None:
+                # The custom pattern already read the numbers - only indicators are still of interest
+                continue
+
+            position_group, total_group = f"{kind}_position", f"{kind}_total"
+            layout = self.layouts[int(kind[6:])]
+            position = parse_number(match.group(position_group))
+            total = parse_number(match.group(total_group))
+            # Queue positions start at 1 and never exceed the queue length
+            if position is not None and total is not None and 0 < position <= total:
+                return QueueMatch(True, position, total, layout, match.span(),
+                                  match.span(position_group), match.span(total_group), tuple(indicators))
+            queue_span = queue_span or match.span()
+
+        if custom is not None:
+            return custom._replace(indicators=tuple(indicators))
+        if queue_span is not None:
+            return QueueMatch(True, None, None, None, queue_span, None, None, tuple(indicators))
+        return NO_MATCH._replace(indicators=tuple(indicators))
+
+
+# Shared matcher, replaced as a whole when settings change
+_matcher = QueuePatternMatcher()
+
+
+def get_queue_matcher():
+    return _matcher
+
+
+def configure_queue_matcher(pattern=QUEUE_TEXT_PATTERN, indicators=IN_GAME_INDICATORS, layouts=QUEUE_LAYOUTS,
+                            keywords=QUEUE_KEYWORDS):
+    """
+    Rebuild the shared matcher after settings changed (raises re.error for an invalid pattern)
+    """
+    global _matcher
+    _matcher = QueuePatternMatcher(pattern, layouts, keywords, indicators)
+    return _matcher
@@ -0,0 +1,93 @@
+import threading
+from collections import namedtuple
+from config import LOADING_STATE_SECONDS, QUEUE_EXIT_FRAMES
+
+# Queue states of a game client
+STATE_NO_GAME = "no_game"  # Game process not running
+STATE_MENU = "menu"  # Game running, not in a queue
+STATE_QUEUED = "queued"  # In a server queue; position and total while readable
+STATE_LOADING = "loading"  # Just left the queue - joining the server
+STATE_IN_GAME = "in_game"  # On the server
+
+
+class QueueTransition(namedtuple("QueueTransition", ["previous", "state", "position", "total"])):
+    """
+    A change of queue state; a new position or total while queued is a STATE_QUEUED -> STATE_QUEUED transition
+    """
+    __slots__ = ()
+
+    @property
+    def entered(self):
+        """
+        True when the queue was just left for the server
+        """
+        return self.previous == STATE_QUEUED and self.state == STATE_LOADING
+
+
+class QueueStateMachine:
+    """
+    Queue state of one game client: NoGame -> Menu -> Queued(position, total) -> Loading -> InGame,
+    driven by game process probes (game_found) and recognized frames (update). The queue is only
+    left after exit_frames consecutive frames without it; a queue seen again before that keeps the
+    client queued, so a single misread never counts as entering the server.
+    Both return a QueueTransition only when the state or the queue numbers change and None
+    otherwise, without allocating anything, so they can run on every tick.
+    """
+    __slots__ = ("loading_seconds", "exit_frames", "state", "position", "total", "changed_at", "missed", "lock")
+
+    def __init__(self, game_running=True, loading_seconds=LOADING_STATE_SECONDS, exit_frames=QUEUE_EXIT_FRAMES):
+        self.loading_seconds = loading_seconds
+        self.exit_frames = exit_frames
+        self.lock = threading.Lock()
+        self.reset(game_running)
+
+    def reset(self, game_running=True):
+        with self.lock:
+            self.state = STATE_MENU if game_running else STATE_NO_GAME
+            self.position = None
+            self.total = None
+            self.changed_at = 0.0
+            self.missed = 0  # Consecutive frames without the queue while queued
+
+    def in_queue(self):
+        return self.state == STATE_QUEUED
+
+    def game_found(self, running, now):
+        """
+        Record whether the game process is running
+        """
+        with self.lock:
+            if running != (self.state == STATE_NO_GAME):
+                return None
+            return self._move(STATE_MENU if running else STATE_NO_GAME, None, None, now)
+
+    def update(self, in_queue, position, total, now):
+        """
+        Record the queue status of a recognized frame
+        """
+        with self.lock:
+            state = self.state
+            if in_queue:
+                self.missed = 0
+                if state == STATE_QUEUED and position == self.position and total == self.total:
+                    return None
+                return self._move(STATE_QUEUED, position, total, now)
+            if state == STATE_QUEUED:
+                self.missed += 1
+                if self.missed < self.exit_frames:
+                    # Possibly a misread - wait for the next frame to confirm
+                    return None
+                # Queue left - the server is loading
+                return self._move(STATE_LOADING, None, None, now)
+            if state == STATE_LOADING and now - self.changed_at >= self.loading_seconds:
+                return self._move(STATE_IN_GAME, None, None, now)
+            return None
+
+    def _move(self, state, position, total, now):
+        transition = QueueTransition(self.state, state, position, total)
+        self.state = state
+        self.position = position
+        self.total = total
+        self.changed_at = now
+        self.missed = 0
+        return transition
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+from config import ROI_ANCHOR_WORD, ROI_PADDING, ROI_RIGHT_EXTENSION, ROI_CACHE_PATH
+
+
+class QueueRegionLocator:
+    """
+    Locates the queue panel ("Position: X / Y") on a frame once and caches its rectangle
+    per screen resolution and window size, so later ticks only OCR that small region.
+    cache_path None keeps the regions in memory only (OCR worker processes).
+    """
+
+    def __init__(self, cache_path=ROI_CACHE_PATH):
+        self.cache_path = cache_path
+        self.regions = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def make_key(frame_shape, screen_size=None):
+        """
+        Build cache key from screen resolution and captured frame (window) size
+        """
+        frame_height, frame_width = frame_shape[:2]
+        if screen_size:
+            return f"{screen_size[0]}x{screen_size[1]}@{frame_width}x{frame_height}"
+        return f"{frame_width}x{frame_height}"
+
+    def load(self):
+        """
+        Load cached regions from disk
+        """
+        if self.cache_path is None:
+            return
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    self.regions = {key: tuple(rect) for key, rect in json.load(f).items()}
+        except Exception as e:
+            print(f"Error loading ROI cache: {e}")
+            self.regions = {}
+
+    def save(self):
+        """
+        Persist cached regions to disk
+        """
+        if self.cache_path is None:
+            return
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump({key: list(rect) for key, rect in self.regions.items()}, f, indent=4)
+        except Exception as e:
+            print(f"Error saving ROI cache: {e}")
+
+    def get_region(self, frame_shape, screen_size=None):
+        """
+        Get cached region (left, top, width, height) for this frame size, or None
+        """
+        with self.lock:
+            return self.regions.get(self.make_key(frame_shape, screen_size))
+
+    def invalidate(self, frame_shape, screen_size=None):
+        """
+        Forget the cached region for this frame size
+        """
+        with self.lock:
+            if self.regions.pop(self.make_key(frame_shape, screen_size), None) is not None:
+                self.save()
+
+    def locate(self, words, frame_shape, screen_size=None):
+        """
+        Find the queue panel from OCR word boxes and cache it
+        Returns: region (left, top, width, height) or None if the anchor word was not found
+        """
+        anchor_word = ROI_ANCHOR_WORD.lower()
+        anchor = next((w for w in words if w["text"].lower().startswith(anchor_word)), None)
+        if anchor is None:
+            return None
+
+        # Union of the anchor and the words following it on the same line ("X / Y")
+        line_words = [w for w in words if w["line"] == anchor["line"] and w["left"] >= anchor["left"]]
+        left = min(w["left"] for w in line_words)
+        top = min(w["top"] for w in line_words)
+        right = max(w["left"] + w["width"] for w in line_words)
+        bottom = max(w["top"] + w["height"] for w in line_words)
+
+        # Pad by line height and leave room to the right for longer numbers
+        line_height = bottom - top
+        padding = int(line_height * ROI_PADDING)
+        frame_height, frame_width = frame_shape[:2]
+        left = max(0, left - padding)
+        top = max(0, top - padding)
+        right = min(frame_width, right + padding + int(line_height * ROI_RIGHT_EXTENSION))
+        bottom = min(frame_height, bottom + padding)
+
+        region = (left, top, right - left, bottom - top)
+        self.set_region(frame_shape, screen_size, region)
+        return region
+
+    def set_region(self, frame_shape, screen_size, region, save=True):
+        """
+        Cache region for this frame size (e.g. one located in an OCR worker process)
+        """
+        with self.lock:
+            key = self.make_key(frame_shape, screen_size)
+            if self.regions.get(key) == region:
+                return
+            self.regions[key] = region
+            if save:
+                self.save()
+
+
+def crop_region(image, region):
+    """
+    Crop image to region (left, top, width, height); returns a view, not a copy
+    """
+    left, top, width, height = region
+    return image[top:top + height, left:left + width]
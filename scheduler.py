@@ -0,0 +1,102 @@
+import threading
+from array import array
+from config import (
+    CHECK_INTERVAL, MIN_CHECK_INTERVAL, MAX_CHECK_INTERVAL, POLL_FRONT_POSITION, POLL_FAR_POSITION
+)
+
+
+class PollScheduler:
+    """
+    Picks the delay before the next queue check from the current position and how fast it moves:
+    slow polling far back in the queue, sub-second polling near the front
+    """
+
+    def __init__(self, base_interval=CHECK_INTERVAL, min_interval=MIN_CHECK_INTERVAL,
+                 max_interval=MAX_CHECK_INTERVAL, history_size=20):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        # Ring buffer of recent (timestamp, position) samples, written in place on every check
+        self.history_size = history_size
+        self.times = array("d", [0.0]) * history_size
+        self.positions = array("l", [0]) * history_size
+        self.count = 0
+        self.index = 0
+        self.lock = threading.Lock()
+
+    def set_bounds(self, base_interval, min_interval, max_interval):
+        """
+        Update intervals from settings
+        """
+        if min_interval <= 0 or min_interval > max_interval:
+            raise ValueError("Invalid check interval bounds")
+        with self.lock:
+            self.base_interval = base_interval
+            self.min_interval = min_interval
+            self.max_interval = max_interval
+
+    def reset(self):
+        """
+        Forget position history
+        """
+        with self.lock:
+            self.count = 0
+            self.index = 0
+
+    def record(self, timestamp, position):
+        """
+        Add a queue position sample; history is cleared when leaving the queue
+        """
+        with self.lock:
+            if position is None:
+                self.count = 0
+                self.index = 0
+                return
+            self.times[self.index] = timestamp
+            self.positions[self.index] = position
+            self.index = (self.index + 1) % self.history_size
+            if self.count < self.history_size:
+                self.count += 1
+
+    def drain_rate(self):
+        """
+        Positions per second over the recent history, or None if the queue has not moved
+        """
+        with self.lock:
+            if self.count < 2:
+                return None
+            first = (self.index - self.count) % self.history_size
+            last = (self.index - 1) % self.history_size
+            first_time, first_position = self.times[first], self.positions[first]
+            last_time, last_position = self.times[last], self.positions[last]
+        if last_time <= first_time or last_position >= first_position:
+            return None
+        return (first_position - last_position) / (last_time - first_time)
+
+    def next_interval(self, position, rate=None):
+        """
+        Seconds to wait before the next check
+        rate: drain rate in positions per second, estimated from history if not given
+        """
+        if position is None:
+            return self._clamp(self.base_interval)
+
+        if position <= POLL_FRONT_POSITION:
+            return self.min_interval
+
+        if rate is None:
+            rate = self.drain_rate()
+
+        if rate:
+            # Check twice per expected position change, and at least four times before reaching the front
+            seconds_per_position = 1 / rate
+            seconds_to_front = (position - POLL_FRONT_POSITION) / rate
+            return self._clamp(min(seconds_per_position / 2, seconds_to_front / 4))
+
+        # Queue movement unknown - scale linearly with position
+        share = min(1.0, (position - POLL_FRONT_POSITION) / (POLL_FAR_POSITION - POLL_FRONT_POSITION))
+        return self._clamp(self.min_interval + (self.max_interval - self.min_interval) * share)
+
+    def _clamp(self, interval):
+        return max(self.min_interval, min(self.max_interval, interval))
@@ -1,25 +1,43 @@
 import cv2
 import numpy as np
 import os
-import win32gui
-import win32ui
-import win32con
-import win32api
-import win32process
+import threading
+from collections import namedtuple
 import psutil  # For working with system processes
-from ctypes import windll
-from PIL import Image
-from config import DEBUG_DIR, GAME_PROCESS_NAME
-
-
-def is_game_running():
+from config import DEBUG_DIR, GAME_PROCESS_NAME, SCREEN_CAPTURE_MONITOR
+from preprocessing import default_preprocessor, adaptive_preprocessor
+
+# Try to import Win32 modules for window capture (Windows only)
+try:
+    import win32gui
+    import win32ui
+    import win32con
+    import win32api
+    import win32process
+    from ctypes import windll
+    win32_available = True
+except ImportError:
+    print("WARNING: Win32 modules not available. Game window capture disabled.")
+    win32_available = False
+
+# mss grabs screen regions without going through PIL (optional)
+try:
+    import mss
+    mss_available = True
+except ImportError:
+    mss_available = False
+_mss_local = threading.local()
+
+
+def is_game_running(process_name=None):
     """
     Check if the game process is running through the system process list
     """
+    process_name = (process_name or GAME_PROCESS_NAME).lower()
     try:
         # Find the game process (SquadGame.exe or whatever it's called in the system)
         for proc in psutil.process_iter(['pid', 'name']):
-            if GAME_PROCESS_NAME.lower() in proc.info['name'].lower():
+            if process_name in (proc.info['name'] or '').lower():
                 return True, proc.info['name'], proc.info['pid']
         return False, None, None
     except Exception as e:
@@ -27,6 +45,23 @@ def is_game_running():
         return False, None, None
 
 
+def find_game_processes(process_name=None):
+    """
+    Find every running game process (several clients can run on one machine)
+    Returns: list of (process name, pid), ordered by pid
+    """
+    process_name = (process_name or GAME_PROCESS_NAME).lower()
+    try:
+        return sorted(
+            ((proc.info['name'], proc.info['pid']) for proc in psutil.process_iter(['pid', 'name'])
+             if process_name in (proc.info['name'] or '').lower()),
+            key=lambda x: x[1]
+        )
+    except Exception as e:
+        print(f"Error checking game process: {e}")
+        return []
+
+
 def find_game_window():
     """
     Find the game window using process information
@@ -36,7 +71,17 @@ def find_game_window():
     if not game_running:
         return None, None
 
-    # If the game process is running, find the corresponding window
+    return find_process_window(pid)
+
+
+def find_process_window(pid):
+    """
+    Find the largest visible window of a process
+    Returns: window handle and title
+    """
+    if not win32_available:
+        return None, None
+
     def callback(hwnd, results):
         if win32gui.IsWindowVisible(hwnd) and win32gui.IsWindowEnabled(hwnd):
             # Get the PID of the process that owns the window
@@ -60,6 +105,116 @@ def find_game_window():
     return None, None
 
 
+# Result of GameLocator.locate(); fields are None when the process or window was not found
+GameLocation = namedtuple("GameLocation", ["process_name", "pid", "hwnd", "title"])
+
+
+class GameLocator:
+    """
+    Caches the game process and window between checks. Each call only verifies that the
+    cached process is alive and the window still exists with the same size, and falls back
+    to a full process/window scan when that check fails.
+    """
+
+    def __init__(self, process_name=GAME_PROCESS_NAME):
+        self.process_name = process_name
+        self.lock = threading.Lock()
+        self.invalidate()
+
+    def set_process_name(self, process_name):
+        """
+        Change the game process name and drop the cached process
+        """
+        with self.lock:
+            self.process_name = process_name
+            self._clear()
+
+    def invalidate(self):
+        """
+        Drop the cached process and window, forcing a full scan on the next call
+        """
+        with self.lock:
+            self._clear()
+
+    def _clear(self):
+        self.process = None
+        self.process_label = None
+        self.hwnd = None
+        self.title = None
+        self.rect = None
+        # Windows of all game clients for locate_all: pid -> (hwnd, title, rect)
+        self.windows = {}
+
+    def _process_valid(self):
+        # is_running() also compares the creation time, so a reused PID is not mistaken for the game
+        try:
+            return self.process is not None and self.process.is_running()
+        except psutil.Error:
+            return False
+
+    def _window_valid(self):
+        return window_unchanged(self.hwnd, self.process.pid, self.rect)
+
+    def _find_window(self):
+        self.hwnd, self.title = find_process_window(self.process.pid)
+        self.rect = win32gui.GetWindowRect(self.hwnd) if self.hwnd else None
+
+    def locate(self):
+        """
+        Find the game process and window, using the cached ones while they are valid
+        Returns: GameLocation
+        """
+        with self.lock:
+            if not self._process_valid():
+                self._clear()
+                running, process_label, pid = is_game_running(self.process_name)
+                if not running:
+                    return GameLocation(None, None, None, None)
+                try:
+                    self.process = psutil.Process(pid)
+                except psutil.Error:
+                    return GameLocation(None, None, None, None)
+                self.process_label = process_label
+
+            if not self._window_valid():
+                self._find_window()
+
+            return GameLocation(self.process_label, self.process.pid, self.hwnd, self.title)
+
+    def locate_all(self):
+        """
+        Find every running game client and its window, reusing the cached windows
+        of clients seen before while they are still valid
+        Returns: list of GameLocation, ordered by pid
+        """
+        with self.lock:
+            locations = []
+            windows = {}
+            for process_label, pid in find_game_processes(self.process_name):
+                hwnd, title, rect = self.windows.get(pid, (None, None, None))
+                if not window_unchanged(hwnd, pid, rect):
+                    hwnd, title = find_process_window(pid)
+                    rect = win32gui.GetWindowRect(hwnd) if hwnd else None
+                windows[pid] = (hwnd, title, rect)
+                locations.append(GameLocation(process_label, pid, hwnd, title))
+            self.windows = windows
+            return locations
+
+
+def window_unchanged(hwnd, pid, rect):
+    """
+    Check that a window still exists, belongs to process pid and has not moved or resized
+    """
+    if hwnd is None or not win32_available:
+        return False
+    try:
+        return (win32gui.IsWindow(hwnd)
+                and win32process.GetWindowThreadProcessId(hwnd)[1] == pid
+                and win32gui.GetWindowRect(hwnd) == rect)
+    except Exception:
+        return False
+
+
 def get_window_area(hwnd):
     """
     Calculate window area
@@ -74,6 +229,9 @@ def find_window_by_title(title_part):
     Returns: window handle and full title
     """
 
+    if not win32_available:
+        return None, None
+
     def callback(hwnd, results):
         if win32gui.IsWindowVisible(hwnd):
             title = win32gui.GetWindowText(hwnd)
@@ -96,17 +254,23 @@ def find_window_by_title(title_part):
     return None, None
 
 
-def capture_window(window_title=None):
+def capture_window(window_title=None, locator=None, gray=False, pool=None, region=None):
     """
     Capture the content of the game window
     If window_title = None, try to find the window through the process
+    locator: optional GameLocator that provides the (cached) game window
+    gray, pool, region: see capture_window_handle
     """
     try:
         hwnd = None
         full_title = None
 
         # First try to find the window through the process
-        game_hwnd, game_title = find_game_window()
+        if locator is not None:
+            location = locator.locate()
+            game_hwnd, game_title = location.hwnd, location.title
+        else:
+            game_hwnd, game_title = find_game_window()
 
         if game_hwnd:
             hwnd = game_hwnd
@@ -124,6 +288,24 @@ def capture_window(window_title=None):
             print("Game window not found")
             return None
 
+        return capture_window_handle(hwnd, gray, pool, region)
+    except Exception as e:
+        print(f"Error capturing window: {e}")
+        return None
+
+
+def capture_window_handle(hwnd, gray=False, pool=None, region=None):
+    """
+    Capture the content of a window by its handle (e.g. one of several game clients)
+    gray: return a grayscale frame instead of BGR
+    pool: optional FrameBufferPool the frame is written into
+    region: (left, top, width, height) in client area coordinates - only these pixels are grabbed;
+    returns None when no part of it lies inside the window
+    """
+    if not win32_available:
+        return None
+
+    try:
         # Get window dimensions
         left, top, right, bottom = win32gui.GetClientRect(hwnd)
         width = right - left
@@ -134,90 +316,233 @@ def capture_window(window_title=None):
             print(f"Window dimensions too small: {width}x{height}")
             return None
 
-        # Get window coordinates on screen
-        window_left, window_top, _, _ = win32gui.GetWindowRect(hwnd)
+        code = cv2.COLOR_BGRA2GRAY if gray else cv2.COLOR_BGRA2BGR
+        if region is not None:
+            region = clip_region(region, width, height)
+            if region is None:
+                # The panel lies outside the (resized) window - the caller has to capture the full frame again
+                return None
+            if hwnd not in _print_window_only:
+                view = blit_client_region(hwnd, region)
+                if view[:, :, :3].any():
+                    return convert_frame(view, code, pool)
+                # Blank - the window does not draw through its DC (e.g. hardware accelerated)
+                _print_window_only.add(hwnd)
+
+        view = print_window(hwnd, width, height)
+        if region is not None:
+            region_left, region_top, region_width, region_height = region
+            view = view[region_top:region_top + region_height, region_left:region_left + region_width]
+        return convert_frame(view, code, pool)
+    except Exception as e:
+        print(f"Error capturing window: {e}")
+        return None
 
-        # Add client area offset relative to window
-        left += window_left
-        top += window_top
 
-        # Create contexts for capture
-        hwndDC = win32gui.GetWindowDC(hwnd)
-        mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-        saveDC = mfcDC.CreateCompatibleDC()
+# Windows whose client area reads blank through BitBlt; regions are cropped from PrintWindow instead
+_print_window_only = set()
 
-        # Create bitmap
-        saveBitMap = win32ui.CreateBitmap()
-        saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-        saveDC.SelectObject(saveBitMap)
 
-        # Copy window data to bitmap
-        result = windll.user32.PrintWindow(hwnd, saveDC.GetSafeHdc(), 3)
+def print_window(hwnd, width, height):
+    """
+    Render the client area of a window through PrintWindow
+    Returns: (height, width, 4) BGRX view of the bitmap
+    """
+    # Create contexts for capture
+    hwndDC = win32gui.GetWindowDC(hwnd)
+    mfcDC = win32ui.CreateDCFromHandle(hwndDC)
+    saveDC = mfcDC.CreateCompatibleDC()
+
+    # Create bitmap
+    saveBitMap = win32ui.CreateBitmap()
+    saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
+    saveDC.SelectObject(saveBitMap)
+
+    try:
+        # Copy window data to bitmap (client area, including hardware accelerated content)
+        windll.user32.PrintWindow(hwnd, saveDC.GetSafeHdc(), 3)
 
-        # Save bitmap to bytes array
+        # Wrap the bitmap bytes without copying
         bmpinfo = saveBitMap.GetInfo()
-        bmpstr = saveBitMap.GetBitmapBits(True)
+        return bitmap_view(saveBitMap.GetBitmapBits(True), bmpinfo['bmWidth'], bmpinfo['bmHeight'])
+    finally:
+        # Release resources
+        win32gui.DeleteObject(saveBitMap.GetHandle())
+        saveDC.DeleteDC()
+        mfcDC.DeleteDC()
+        win32gui.ReleaseDC(hwnd, hwndDC)
 
-        # Create image from data
-        img = Image.frombuffer(
-            'RGB',
-            (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-            bmpstr, 'raw', 'BGRX', 0, 1
-        )
 
-        # Convert to OpenCV format
-        screenshot = np.array(img)
-        screenshot = cv2.cvtColor(screenshot, cv2.COLOR_RGB2BGR)
+def blit_client_region(hwnd, region):
+    """
+    Copy only region of the client area of a window through BitBlt
+    Returns: (height, width, 4) BGRX view of the bitmap
+    """
+    left, top, width, height = region
+    hwndDC = win32gui.GetDC(hwnd)
+    mfcDC = win32ui.CreateDCFromHandle(hwndDC)
+    saveDC = mfcDC.CreateCompatibleDC()
+
+    saveBitMap = win32ui.CreateBitmap()
+    saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
+    saveDC.SelectObject(saveBitMap)
 
-        # Release resources
+    try:
+        saveDC.BitBlt((0, 0), (width, height), mfcDC, (left, top), win32con.SRCCOPY)
+        return bitmap_view(saveBitMap.GetBitmapBits(True), width, height)
+    finally:
         win32gui.DeleteObject(saveBitMap.GetHandle())
         saveDC.DeleteDC()
         mfcDC.DeleteDC()
         win32gui.ReleaseDC(hwnd, hwndDC)
 
-        return screenshot
-    except Exception as e:
-        print(f"Error capturing window: {e}")
+
+def clip_region(region, width, height):
+    """
+    Region (left, top, width, height) clipped to a width x height area, or None if nothing is left
+    """
+    left, top, region_width, region_height = region
+    right = min(width, left + region_width)
+    bottom = min(height, top + region_height)
+    left, top = max(0, left), max(0, top)
+    if right <= left or bottom <= top:
         return None
+    return left, top, right - left, bottom - top
 
 
-def capture_full_screen():
+def capture_full_screen(gray=False, pool=None, region=None, monitor=SCREEN_CAPTURE_MONITOR):
     """
-    Fallback option - capture entire screen
+    Fallback option - capture the screen: one monitor through mss when it is installed,
+    the primary monitor through pyautogui otherwise
+    gray, pool: see capture_window_handle
+    region: (left, top, width, height) relative to the monitor - only these pixels are grabbed
+    monitor: mss monitor number (1 - primary)
     """
     try:
+        if mss_available:
+            grabber = getattr(_mss_local, "grabber", None)
+            if grabber is None:
+                # mss handles must not be shared between threads
+                grabber = _mss_local.grabber = mss.mss()
+            monitors = grabber.monitors
+            bounds = monitors[monitor] if 0 < monitor < len(monitors) else monitors[1]
+            area = (0, 0, bounds["width"], bounds["height"])
+            if region is not None:
+                area = clip_region(region, bounds["width"], bounds["height"])
+                if area is None:
+                    return None
+            shot = grabber.grab({
+                "left": bounds["left"] + area[0], "top": bounds["top"] + area[1],
+                "width": area[2], "height": area[3],
+            })
+            view = bitmap_view(shot.raw, shot.width, shot.height)
+            return convert_frame(view, cv2.COLOR_BGRA2GRAY if gray else cv2.COLOR_BGRA2BGR, pool)
+
         import pyautogui
-        screenshot = pyautogui.screenshot()
-        screenshot = np.array(screenshot)
-        screenshot = cv2.cvtColor(screenshot, cv2.COLOR_RGB2BGR)
-        return screenshot
+        screenshot = np.asarray(pyautogui.screenshot(region=region))
+        return convert_frame(screenshot, cv2.COLOR_RGB2GRAY if gray else cv2.COLOR_RGB2BGR, pool)
     except Exception as e:
         print(f"Error capturing screen: {e}")
         return None
 
 
+def bitmap_view(bits, width, height):
+    """
+    BGRX bitmap bytes as a (height, width, 4) array sharing their memory
+    """
+    return np.frombuffer(bits, np.uint8).reshape(height, width, 4)
+
+
+def convert_frame(image, code, pool=None):
+    """
+    Color-convert a captured image in a single pass, into a pooled buffer when pool is given
+    """
+    if pool is None:
+        return cv2.cvtColor(image, code)
+    channels = 1 if code in (cv2.COLOR_BGRA2GRAY, cv2.COLOR_RGB2GRAY) else 3
+    shape = image.shape[:2] if channels == 1 else image.shape[:2] + (3,)
+    return cv2.cvtColor(image, code, dst=pool.get(shape))
+
+
+class FrameBufferPool:
+    """
+    Reusable capture buffers. get() leases a buffer out until release() hands it back, once the
+    frame is no longer needed (dropped from the frame queue or recognized). When every buffer is
+    leased a new one is allocated; the pool keeps up to limit buffers.
+    """
+
+    def __init__(self, limit=8):
+        self.limit = limit
+        self.free = []
+        self.leased = {}  # id -> buffer handed out by get() and not released yet
+        self.lock = threading.Lock()
+        self.allocated = 0
+        self.reused = 0
+
+    def get(self, shape, dtype=np.uint8):
+        dtype = np.dtype(dtype)
+        with self.lock:
+            for index, buffer in enumerate(self.free):
+                if buffer.shape == shape and buffer.dtype == dtype:
+                    del self.free[index]
+                    self.reused += 1
+                    self.leased[id(buffer)] = buffer
+                    return buffer
+
+            if self.free and len(self.free) + len(self.leased) >= self.limit:
+                # Frame size changed - replace the oldest free buffer
+                del self.free[0]
+            buffer = np.empty(shape, dtype)
+            self.allocated += 1
+            if len(self.free) + len(self.leased) < self.limit:
+                self.leased[id(buffer)] = buffer
+            return buffer
+
+    def release(self, image):
+        """
+        Hand a buffer from get() back for reuse; other images (e.g. replayed frames) are ignored
+        """
+        with self.lock:
+            buffer = self.leased.pop(id(image), None)
+            if buffer is not None:
+                self.free.append(buffer)
+
+    def get_stats(self):
+        """
+        Returns: (buffers allocated, buffers reused)
+        """
+        with self.lock:
+            return self.allocated, self.reused
+
+
 def preprocess_image(image):
     """
-    Preprocess image to improve OCR
+    Preprocess image to improve OCR (with the profile for its resolution)
+    Returns: a new binary image - the OCR cascade uses the Preprocessor buffers directly
     """
     if image is None:
         return None
 
     try:
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return default_preprocessor.run(image)[0].copy()
+    except Exception as e:
+        print(f"Error processing image: {e}")
+        return image  # Return original image in case of error
 
-        # Apply binarization (adaptive threshold)
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
 
-        # Remove noise with morphological operations
-        kernel = np.ones((1, 1), np.uint8)
-        opening = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
+def preprocess_image_adaptive(image):
+    """
+    Alternative preprocessing with local (adaptive) thresholding, for frames where
+    a single global threshold loses the text
+    """
+    if image is None:
+        return None
 
-        return opening
+    try:
+        return adaptive_preprocessor.run(image)[0].copy()
     except Exception as e:
         print(f"Error processing image: {e}")
-        return image  # Return original image in case of error
+        return image
 
 
 def save_debug_images(original, processed, text):
@@ -257,6 +582,8 @@ def get_window_titles():
     """
     Get a list of titles of all visible windows
     """
+    if not win32_available:
+        return []
 
     def callback(hwnd, titles):
         if win32gui.IsWindowVisible(hwnd):
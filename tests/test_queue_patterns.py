@@ -0,0 +1,56 @@
+import pytest
+from queue_patterns import QueuePatternMatcher, configure_queue_matcher
+
+# Without the custom pattern, so only the built-in layouts and keywords are exercised
+matcher = QueuePatternMatcher(pattern="")
+
+
+@pytest.mark.parametrize("text, position, total", [
+    ("Position: 7 / 42", 7, 42),
+    ("position: 12 / 45", 12, 45),
+    ("Posltion: 1O / 2S", 10, 25),
+    ("Queue: 3/40", 3, 40),
+    ("Position 3 of 40\nLeave queue", 3, 40),
+    ("12 / 45 in queue", 12, 45),
+])
+def test_queue_layouts(text, position, total):
+    assert matcher.match(text)[:3] == (True, position, total)
+
+
+@pytest.mark.parametrize("text", [
+    # Tokens of digit look-alike letters only are not numbers
+    "queue: I / GO",
+    "position: is / BOOST",
+    "Position: Big / Tool",
+    # Layout words inside other words, or followed by more words on the line
+    "Composition: 3 / 40",
+    "Position 1 of 3 slides",
+])
+def test_no_queue_numbers_in_other_text(text):
+    assert matcher.match(text).position is None
+
+
+@pytest.mark.parametrize("text", [
+    "queue: I / GO",
+    "position: is / BOOST",
+    "Composition: 3 / 40",
+    "Position 1 of 3 slides",
+    "the position of the cursor",
+])
+def test_not_in_queue(text):
+    assert not matcher.match(text).in_queue
+
+
+def test_custom_pattern_with_inline_flags():
+    custom = QueuePatternMatcher(pattern=r"(?i)Pos (\d+) - (\d+)")
+    assert custom.match("POS 3 - 9")[:4] == (True, 3, 9, "custom")
+
+
+def test_settings_rebuild_the_same_matcher():
+    custom = QueuePatternMatcher(pattern=r"Wait (\d+) of (\d+)", indicators=["Alive"])
+    rebuilt = configure_queue_matcher(*custom.settings)
+    try:
+        assert rebuilt.settings == custom.settings
+        assert rebuilt.match("Wait 7 of 9")[:3] == (True, 7, 9)
+    finally:
+        configure_queue_matcher()
@@ -3,23 +3,25 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
 import os
-import pyautogui
-import urllib.request
-from PIL import Image, ImageTk
-import io
 import re
 import time
-import webbrowser
-import cv2
 
+# Only light modules are imported here - OpenCV, NumPy, OCR, PIL and the Win32 modules are
+# loaded in the background once the window is shown (see load_engine)
 from config import (
-    CHECK_INTERVAL, QUEUE_TEXT_PATTERN, IN_GAME_INDICATORS,
-    LOGO_PATH, CREATOR_GITHUB_URL, GAME_PROCESS_NAME, GAME_WINDOW_TITLE
+    CHECK_INTERVAL, MIN_CHECK_INTERVAL, MAX_CHECK_INTERVAL, QUEUE_TEXT_PATTERN, IN_GAME_INDICATORS,
+    LOGO_PATH, CREATOR_GITHUB_URL, GAME_PROCESS_NAME, GAME_WINDOW_TITLE, MULTI_TARGET_MODE,
+    UI_UPDATE_INTERVAL, ENGINE_LOAD_TIMEOUT
 )
 from language import get_text, i18n
-from screen_capture import capture_window, capture_full_screen, preprocess_image, save_debug_images
-from ocr_processor import extract_text, analyze_queue_status, test_regex
-from notification import send_notification  # Добавьте этот импорт
+from queue_patterns import configure_queue_matcher
+from probes import ProbeWorker
+from ui_bus import UiUpdateBus
+from log_buffer import LogBuffer, start_file_log
+from log_view import LogView
+from metrics import StageMetrics
+from events import EVENT_GAME, EVENT_STATUS, EVENT_ENTERED, EVENT_TARGET_ADDED, EVENT_TARGET_REMOVED, EVENT_ERROR
+from queue_state import STATE_QUEUED, STATE_LOADING, STATE_IN_GAME
 
 
 class SquadQueueMonitorUI:
@@ -31,10 +33,41 @@ class SquadQueueMonitorUI:
 
         # Global variables for monitoring state
         self.running = False
-        self.monitor_thread = None
-        self.last_position = None
-        self.last_total = None
-        self.in_game_detected = False
+
+        # Monitoring core (capture, OCR, queue state), created in the background after the window
+        # is shown (see load_engine); its events are applied on the Tk thread
+        self.engine = None
+        # Set once loading finished; engine stays None and engine_error holds the reason if it failed
+        self.engine_ready = threading.Event()
+        self.engine_error = None
+        self.start_requested = False
+        self.target_status = {}
+        # Last queue state event of the game window, shown again after a language change
+        self.queue_status = None
+
+        # Per-stage latency histories, shared with the engine
+        self.stage_metrics = StageMetrics()
+
+        # Parts of the engine used directly by the UI (settings, debug tab, test capture)
+        self.game_locator = None
+        self.capture_backend = None
+        self.ocr_cascade = None
+        self.change_detector = None
+        self.poll_scheduler = None
+
+        # Game window and screen resolution probes run in a background thread (started with the engine)
+        self.probe_worker = None
+        self.probe_version = None
+        self.shown_location = None  # Window indicator state last shown, see show_game_location
+        self.logo_labels = []
+
+        # Updates from background threads, applied on the Tk thread in batches;
+        # post-to-paint latency goes to the stage table as "ui_update"
+        self.ui_bus = UiUpdateBus(self.stage_metrics)
+
+        # Recent log entries for the debug tab; the full log goes to a rotating file
+        self.log_buffer = LogBuffer()
+        self.file_logger = start_file_log()
 
         # Initialize UI elements
         self.setup_tabs()
@@ -43,24 +76,105 @@ class SquadQueueMonitorUI:
         self.setup_debug_tab()
         self.setup_about_tab()
 
-        # Start screen resolution update
-        self.update_screen_resolution_info()
+        # Start the Tk-side poll for background updates
+        self.process_ui_updates()
+
+        # Start refreshing the stage latency table (only does work while the debug tab is shown)
+        self.update_stage_metrics_table()
 
         # Add startup message to logs
         self.log(get_text("program_started"))
 
+        # Load the heavy modules once the window has been drawn
+        self.root.after_idle(lambda: threading.Thread(target=self.load_engine, daemon=True).start())
+
+    def load_engine(self):
+        """
+        Import the monitoring core (OpenCV, NumPy, OCR, Win32 modules), create the engine and
+        load the logo (runs in a background thread, so the window appears first)
+        """
+        try:
+            from monitor_engine import MonitorEngine
+            engine = MonitorEngine(on_event=self.handle_engine_event, stage_metrics=self.stage_metrics)
+        except Exception as e:
+            self.ui_bus.post(self.on_engine_failed, e)
+        else:
+            self.ui_bus.post(self.on_engine_loaded, engine)
+        self.ui_bus.post(self.show_logo, self.load_local_logo())
+
+    def on_engine_failed(self, error):
+        """
+        Report that the monitoring engine could not be loaded and leave the interface usable (Tk thread)
+        """
+        self.engine_error = str(error)
+        self.log(f"Error loading monitoring engine: {error}")
+        self.start_requested = False
+        self.status_var.set(f"Error: {error}")
+        self.start_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.engine_ready.set()
+
+    def on_engine_loaded(self, engine):
+        """
+        Connect the loaded engine to the interface (Tk thread)
+        """
+        self.engine = engine
+        self.game_locator = engine.game_locator
+        self.capture_backend = engine.capture_backend
+        self.ocr_cascade = engine.ocr_cascade
+        self.change_detector = engine.change_detector
+        self.poll_scheduler = engine.poll_scheduler
+
+        # Settings changed while loading
+        engine.save_screenshots = self.save_screenshot_var.get()
+        try:
+            self.apply_engine_settings()
+        except ValueError:
+            pass
+
+        self.probe_worker = ProbeWorker(self.game_locator)
+        self.probe_worker.start()
+        self.engine_ready.set()
+        self.update_debug_stats()
+
+        if self.start_requested:
+            self.start_requested = False
+            self.start_monitoring()
+
+    def create_logo_label(self, parent):
+        """
+        Logo label, blank at the logo size until show_logo is called
+        """
+        blank = tk.PhotoImage(width=300, height=150)
+        label = tk.Label(parent, image=blank)
+        label.image = blank  # Keep reference to image
+        self.logo_labels.append(label)
+        return label
+
+    def show_logo(self, image):
+        """
+        Show the logo loaded by load_local_logo in the logo labels (Tk thread)
+        """
+        if image is None:
+            return
+        from PIL import ImageTk
+        photo_img = ImageTk.PhotoImage(image)
+        for label in self.logo_labels:
+            label.config(image=photo_img)
+            label.image = photo_img
+
     def load_local_logo(self):
         """
         Load logo from assets folder
+        Returns: PIL image (turned into a Tk image by show_logo on the Tk thread)
         """
         try:
+            from PIL import Image
             # Check if logo exists
             if os.path.exists(LOGO_PATH):
                 img = Image.open(LOGO_PATH)
                 # Resize image for display
-                img = img.resize((300, 150), Image.LANCZOS)
-                photo_img = ImageTk.PhotoImage(img)
-                return photo_img
+                return img.resize((300, 150), Image.LANCZOS)
             else:
                 print(f"Logo file not found at {LOGO_PATH}")
                 # Create a placeholder logo with text
@@ -75,9 +189,9 @@ class SquadQueueMonitorUI:
         """
         try:
             # Create a simple placeholder image
+            from PIL import Image, ImageDraw, ImageFont
             img = Image.new('RGB', (300, 150), color="#007acc")
             # Add text
-            from PIL import ImageDraw, ImageFont
             draw = ImageDraw.Draw(img)
             try:
                 font = ImageFont.truetype("arial.ttf", 36)
@@ -85,8 +199,7 @@ class SquadQueueMonitorUI:
                 font = ImageFont.load_default()
 
             draw.text((60, 55), "Squad Monitor", fill="white", font=font)
-            photo_img = ImageTk.PhotoImage(img)
-            return photo_img
+            return img
         except Exception as e:
             print(f"Error creating placeholder logo: {e}")
             return None
@@ -95,6 +208,7 @@ class SquadQueueMonitorUI:
         """
         Open creator's GitHub page when the link is clicked
         """
+        import webbrowser
         webbrowser.open(CREATOR_GITHUB_URL)
 
     def change_language(self):
@@ -135,15 +249,8 @@ class SquadQueueMonitorUI:
         logo_frame = ttk.Frame(self.monitor_tab)
         logo_frame.pack(padx=10, pady=10, fill="x")
 
-        # Load and display logo
-        try:
-            logo_image = self.load_local_logo()
-            if logo_image:
-                logo_label = tk.Label(logo_frame, image=logo_image)
-                logo_label.image = logo_image  # Keep reference to image
-                logo_label.pack(anchor="center")
-        except Exception as e:
-            print(f"Error displaying logo: {e}")
+        # Logo is shown once loaded in the background
+        self.create_logo_label(logo_frame).pack(anchor="center")
 
         # Language selector with styling
         language_frame = ttk.Frame(self.monitor_tab)
@@ -217,6 +324,18 @@ class SquadQueueMonitorUI:
         resolution_label = ttk.Label(self.status_frame, textvariable=self.resolution_var, font=("Arial", 10))
         resolution_label.pack(padx=10, pady=5)
 
+        # One row per game client in multi-target mode
+        self.targets_table = None
+        if MULTI_TARGET_MODE:
+            self.targets_table = ttk.Treeview(
+                self.status_frame, columns=("client", "status"), show="headings", height=4
+            )
+            for column in ("client", "status"):
+                self.targets_table.heading(column, text=get_text(f"targets_{column}"))
+            self.targets_table.column("client", width=180)
+            self.targets_table.column("status", width=300)
+            self.targets_table.pack(padx=10, pady=5, fill="both", expand=True)
+
         # Control buttons
         button_frame = ttk.Frame(self.monitor_tab)
         button_frame.pack(padx=10, pady=10, fill="x")
@@ -236,40 +355,95 @@ class SquadQueueMonitorUI:
         )
         self.stop_button.pack(side=tk.RIGHT, padx=5, expand=True, fill="x")
 
-        # Запустим проверку окна игры при запуске
-        self.root.after(1000, self.check_game_window)
-
     def check_game_window(self):
         """
-        Проверяет, запущен ли процесс игры, и обновляет индикатор
+        Проверяет, запущен ли процесс игры - проверка выполняется в фоновом потоке,
+        индикатор обновится, когда придет результат
         """
-        from screen_capture import is_game_running, find_game_window
+        if self.probe_worker is not None:
+            self.probe_worker.wake()
 
-        # Проверяем, запущен ли процесс игры
-        is_running, process_name, pid = is_game_running()
+    def apply_probe_snapshot(self, snapshot, log_changes=True, redraw=False):
+        """
+        Обновляет индикатор окна и разрешение экрана по результатам фоновой проверки
+        """
+        if snapshot.location is not None:
+            self.show_game_location(snapshot.location, log_changes, redraw)
 
-        if is_running:
-            # Игра запущена, пытаемся найти окно
-            game_hwnd, game_title = find_game_window()
+        if snapshot.screen_size is not None:
+            self.engine.screen_size = snapshot.screen_size
+            self.resolution_var.set(get_text("resolution", *snapshot.screen_size))
 
-            if game_hwnd:
-                # Окно игры найдено
-                self.window_status_var.set(get_text("process_and_window_found", process_name, game_title))
-                self.window_status_indicator.config(foreground="green")
-                self.log(get_text("game_process_and_window_found_log", process_name, pid, game_title))
-            else:
-                # Процесс запущен, но окно не найдено (возможно, игра загружается)
-                self.window_status_var.set(get_text("process_found_no_window", process_name))
-                self.window_status_indicator.config(foreground="orange")
-                self.log(get_text("game_process_found_no_window_log", process_name, pid))
+    def show_game_location(self, location, log_changes=True, redraw=False):
+        """
+        Обновляет индикатор окна; в лог пишет только изменения
+        redraw: перерисовать и без изменений (например, после смены языка)
+        """
+        process_name, pid = location.process_name, location.pid
+
+        # Состояние индикатора: найдено ли окно, и какой процесс и окно показаны
+        if pid is not None and location.hwnd:
+            shown = ("window", process_name, pid, location.title)
+        elif pid is not None:
+            shown = ("process", process_name, pid)
+        else:
+            shown = ("none",)
+        changed = shown != self.shown_location
+        if not changed and not redraw:
+            return
+        self.shown_location = shown
+
+        if pid is not None and location.hwnd:
+            # Окно игры найдено
+            text = get_text("process_and_window_found", process_name, location.title)
+            color = "green"
+            log_message = get_text("game_process_and_window_found_log", process_name, pid, location.title)
+        elif pid is not None:
+            # Процесс запущен, но окно не найдено (возможно, игра загружается)
+            text = get_text("process_found_no_window", process_name)
+            color = "orange"
+            log_message = get_text("game_process_found_no_window_log", process_name, pid)
         else:
             # Игра не запущена
-            self.window_status_var.set(get_text("process_not_found", GAME_PROCESS_NAME))
-            self.window_status_indicator.config(foreground="red")
-            self.log(get_text("game_process_not_found_log", GAME_PROCESS_NAME))
+            text = get_text("process_not_found", GAME_PROCESS_NAME)
+            color = "red"
+            log_message = get_text("game_process_not_found_log", GAME_PROCESS_NAME)
+
+        self.window_status_var.set(text)
+        self.window_status_indicator.config(foreground=color)
+        if log_changes and changed:
+            self.log(log_message)
+
+    def process_ui_updates(self):
+        """
+        Apply background updates and new probe snapshots on the Tk thread
+        """
+        posted_times = self.ui_bus.drain()
+        if posted_times:
+            # Idle callbacks run after Tk has redrawn the changed widgets
+            self.root.after_idle(self.ui_bus.record_latency, posted_times)
+
+        # Redraw probe labels only when something changed
+        snapshot = self.probe_worker.get_snapshot() if self.probe_worker is not None else None
+        if snapshot is not None and snapshot.version != self.probe_version:
+            self.probe_version = snapshot.version
+            self.apply_probe_snapshot(snapshot)
 
-        # Запланируем следующую проверку через 5 секунд
-        self.root.after(5000, self.check_game_window)
+        self.root.after(UI_UPDATE_INTERVAL, self.process_ui_updates)
+
+    def run_in_background(self, job, callback):
+        """
+        Run job in a worker thread and call callback(result) on the Tk thread;
+        result is the raised exception if the job failed
+        """
+        def worker():
+            try:
+                result = job()
+            except Exception as e:
+                result = e
+            self.ui_bus.post(callback, result)
+
+        threading.Thread(target=worker, daemon=True).start()
 
     def setup_settings_tab(self):
         """
@@ -367,6 +541,27 @@ class SquadQueueMonitorUI:
         self.ingame_indicators_entry.grid(column=1, row=5, padx=5, pady=5)
         self.ingame_indicators_entry.insert("1.0", ", ".join(IN_GAME_INDICATORS))
 
+        # Adaptive polling bounds
+        self.min_interval_label = ttk.Label(
+            self.settings_frame,
+            text=get_text("min_interval_label")
+        )
+        self.min_interval_label.grid(column=0, row=6, padx=5, pady=5, sticky=tk.W)
+
+        self.min_interval_entry = ttk.Entry(self.settings_frame)
+        self.min_interval_entry.grid(column=1, row=6, padx=5, pady=5)
+        self.min_interval_entry.insert(0, str(MIN_CHECK_INTERVAL))
+
+        self.max_interval_label = ttk.Label(
+            self.settings_frame,
+            text=get_text("max_interval_label")
+        )
+        self.max_interval_label.grid(column=0, row=7, padx=5, pady=5, sticky=tk.W)
+
+        self.max_interval_entry = ttk.Entry(self.settings_frame)
+        self.max_interval_entry.grid(column=1, row=7, padx=5, pady=5)
+        self.max_interval_entry.insert(0, str(MAX_CHECK_INTERVAL))
+
         # Buttons
         settings_buttons_frame = ttk.Frame(self.settings_tab)
         settings_buttons_frame.pack(padx=10, pady=10, fill="x")
@@ -389,9 +584,19 @@ class SquadQueueMonitorUI:
         """
         Показывает список запущенных процессов для выбора игрового процесса
         """
-        from screen_capture import get_running_processes
+        def list_processes():
+            from screen_capture import get_running_processes
+            return get_running_processes()
 
-        processes = get_running_processes()
+        # Перечисление процессов выполняется в фоновом потоке
+        self.run_in_background(list_processes, self.show_process_list_dialog)
+
+    def show_process_list_dialog(self, processes):
+        """
+        Показывает диалог со списком процессов
+        """
+        if isinstance(processes, Exception):
+            processes = []
 
         # Создаем диалоговое окно
         process_list_window = tk.Toplevel(self.root)
@@ -467,6 +672,8 @@ class SquadQueueMonitorUI:
             # Обновляем настройку игрового процесса
             global GAME_PROCESS_NAME
             GAME_PROCESS_NAME = process_name
+            if self.game_locator is not None:
+                self.game_locator.set_process_name(process_name)
 
             # Обновляем поле ввода в настройках
             self.process_name_entry.delete(0, tk.END)
@@ -492,9 +699,19 @@ class SquadQueueMonitorUI:
         """
         Показывает список всех окон для удобства выбора
         """
-        from screen_capture import get_window_titles
+        def list_windows():
+            from screen_capture import get_window_titles
+            return get_window_titles()
+
+        # Перечисление окон выполняется в фоновом потоке
+        self.run_in_background(list_windows, self.show_window_list_dialog)
 
-        window_titles = get_window_titles()
+    def show_window_list_dialog(self, window_titles):
+        """
+        Показывает диалог со списком окон
+        """
+        if isinstance(window_titles, Exception):
+            window_titles = []
 
         # Создаем диалоговое окно
         window_list = tk.Toplevel(self.root)
@@ -574,6 +791,43 @@ class SquadQueueMonitorUI:
         )
         self.save_screenshot_check.pack(padx=10, pady=5, anchor="w")
 
+        # Share of frames that skipped OCR because the screen did not change
+        self.skip_ratio_var = tk.StringVar()
+        self.skip_ratio_var.set(get_text("skip_ratio", 0, 0, 0, 0))
+        skip_ratio_label = ttk.Label(self.debug_frame, textvariable=self.skip_ratio_var)
+        skip_ratio_label.pack(padx=10, pady=5, anchor="w")
+
+        # OCR cascade per-stage hit rates and latencies
+        self.cascade_stats_var = tk.StringVar()
+        self.cascade_stats_var.set(get_text("cascade_stats", ""))
+        cascade_stats_label = ttk.Label(
+            self.debug_frame,
+            textvariable=self.cascade_stats_var,
+            font=("Consolas", 9),
+            justify=tk.LEFT
+        )
+        cascade_stats_label.pack(padx=10, pady=5, anchor="w")
+
+        # Live per-stage latency table
+        self.stage_metrics_frame = ttk.LabelFrame(
+            self.debug_tab,
+            text=get_text("stage_metrics_frame")
+        )
+        self.stage_metrics_frame.pack(padx=10, pady=5, fill="x")
+
+        columns = ("stage", "last", "mean", "p95", "max")
+        self.stage_metrics_table = ttk.Treeview(
+            self.stage_metrics_frame,
+            columns=columns,
+            show="headings",
+            height=7
+        )
+        for column in columns:
+            self.stage_metrics_table.heading(column, text=get_text(f"stage_metrics_{column}"))
+            self.stage_metrics_table.column(column, width=160 if column == "stage" else 70, anchor=tk.E)
+        self.stage_metrics_table.column("stage", anchor=tk.W)
+        self.stage_metrics_table.pack(padx=10, pady=5, fill="x")
+
         # Debug buttons
         button_frame = ttk.Frame(self.debug_frame)
         button_frame.pack(padx=10, pady=5, fill="x")
@@ -599,13 +853,8 @@ class SquadQueueMonitorUI:
         )
         self.log_frame.pack(padx=10, pady=10, fill="both", expand=True)
 
-        self.log_text = scrolledtext.ScrolledText(
-            self.log_frame,
-            wrap=tk.WORD,
-            width=50,
-            height=12
-        )
-        self.log_text.pack(padx=10, pady=10, fill="both", expand=True)
+        self.log_view = LogView(self.log_frame, self.log_buffer, height=12, search_label=get_text("log_search"))
+        self.log_view.pack(fill="both", expand=True)
 
     def setup_about_tab(self):
         """
@@ -615,14 +864,7 @@ class SquadQueueMonitorUI:
         about_frame.pack(padx=20, pady=20, fill="both", expand=True)
 
         # Add logo to about tab
-        try:
-            about_logo_image = self.load_local_logo()
-            if about_logo_image:
-                about_logo_label = tk.Label(about_frame, image=about_logo_image)
-                about_logo_label.image = about_logo_image  # Keep reference to image
-                about_logo_label.pack(anchor="center", pady=15)
-        except Exception as e:
-            print(f"Error displaying logo on about tab: {e}")
+        self.create_logo_label(about_frame).pack(anchor="center", pady=15)
 
         # Author information with GitHub link
         author_frame = ttk.Frame(about_frame)
@@ -673,32 +915,18 @@ class SquadQueueMonitorUI:
         # Update monitor tab
         self.status_frame.config(text=get_text("status_frame"))
 
-        # Update window status
-        from screen_capture import is_game_running, find_game_window
-        is_running, process_name, pid = is_game_running()
-
-        if is_running:
-            game_hwnd, game_title = find_game_window()
-            if game_hwnd:
-                self.window_status_var.set(get_text("process_and_window_found", process_name, game_title))
-                self.window_status_indicator.config(foreground="green")
-            else:
-                self.window_status_var.set(get_text("process_found_no_window", process_name))
-                self.window_status_indicator.config(foreground="orange")
-        else:
-            self.window_status_var.set(get_text("process_not_found", GAME_PROCESS_NAME))
-            self.window_status_indicator.config(foreground="red")
+        # Update window status and screen resolution from the last probe
+        if self.probe_worker is not None:
+            self.apply_probe_snapshot(self.probe_worker.get_snapshot(), log_changes=False, redraw=True)
 
         # Update status text based on current state
-        if self.running:
+        if self.running and self.queue_status is not None:
+            self.status_var.set(self.format_queue_status(self.queue_status))
+        elif self.running:
             self.status_var.set(get_text("running"))
         else:
             self.status_var.set(get_text("not_running"))
 
-        # Update screen resolution
-        screen_width, screen_height = pyautogui.size()
-        self.resolution_var.set(get_text("resolution", screen_width, screen_height))
-
         # Update buttons
         self.start_button.config(text=get_text("start_button"))
         self.stop_button.config(text=get_text("stop_button"))
@@ -709,15 +937,26 @@ class SquadQueueMonitorUI:
         self.pattern_label.config(text=get_text("pattern_label"))
         self.example_label.config(text=get_text("example_label"))
         self.indicators_label.config(text=get_text("indicators_label"))
+        self.min_interval_label.config(text=get_text("min_interval_label"))
+        self.max_interval_label.config(text=get_text("max_interval_label"))
         self.save_button.config(text=get_text("save_button"))
         self.test_button.config(text=get_text("test_button"))
 
         # Update debug tab
         self.debug_frame.config(text=get_text("debug_frame"))
         self.save_screenshot_check.config(text=get_text("save_screenshots"))
+        self.update_skip_ratio_info()
+        self.update_cascade_stats_info()
         self.test_ocr_button.config(text=get_text("test_ocr"))
         self.test_regex_button.config(text=get_text("test_regex"))
         self.log_frame.config(text=get_text("logs_frame"))
+        self.log_view.set_search_label(get_text("log_search"))
+        self.stage_metrics_frame.config(text=get_text("stage_metrics_frame"))
+        if self.targets_table is not None:
+            for column in ("client", "status"):
+                self.targets_table.heading(column, text=get_text(f"targets_{column}"))
+        for column in ("stage", "last", "mean", "p95", "max"):
+            self.stage_metrics_table.heading(column, text=get_text(f"stage_metrics_{column}"))
 
         # Update about tab
         self.about_label.config(state=tk.NORMAL)
@@ -728,15 +967,29 @@ class SquadQueueMonitorUI:
 
     def start_monitoring(self):
         """
-        Start monitoring in a separate thread
+        Start monitoring in background capture and OCR threads
         """
         if self.running:
             return
 
+        if self.engine is None and self.engine_error is not None:
+            self.status_var.set(f"Error: {self.engine_error}")
+            return
+
+        # Started before the engine finished loading - start once it has
+        if self.engine is None:
+            self.start_requested = True
+            self.status_var.set(get_text("loading"))
+            self.start_button.config(state=tk.DISABLED)
+            self.stop_button.config(state=tk.NORMAL)
+            return
+
         self.running = True
-        self.monitor_thread = threading.Thread(target=self.monitor_queue)
-        self.monitor_thread.daemon = True
-        self.monitor_thread.start()
+        if self.targets_table is not None:
+            self.targets_table.delete(*self.targets_table.get_children())
+        self.target_status.clear()
+        self.queue_status = None
+        self.engine.start()
         self.status_var.set(get_text("running"))
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
@@ -746,105 +999,109 @@ class SquadQueueMonitorUI:
         Stop monitoring
         """
         self.running = False
+        self.start_requested = False
+        if self.engine is not None:
+            self.engine.stop()
         self.status_var.set(get_text("stopped"))
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
 
-    def monitor_queue(self):
+    def handle_engine_event(self, event):
         """
-        Main queue monitoring function - scans the game window or full screen
+        Hand a monitoring engine event (from a capture or OCR thread) to the Tk thread.
+        A newer status or game event replaces one that has not been shown yet.
         """
-        was_in_queue = False
+        kind = event["event"]
+        if kind == EVENT_STATUS:
+            self.ui_bus.post(self.apply_engine_event, event, key=(kind, event["target"]))
+        elif kind == EVENT_GAME:
+            self.ui_bus.post(self.apply_engine_event, event, key=kind)
+        else:
+            self.ui_bus.post(self.apply_engine_event, event)
 
-        while self.running:
-            try:
-                # Check if game is running
-                from screen_capture import is_game_running, find_game_window, capture_window, capture_full_screen
-
-                is_running, process_name, pid = is_game_running()
-
-                if is_running:
-                    # Game is running, try to capture window
-                    game_hwnd, game_title = find_game_window()
-
-                    if game_hwnd:
-                        # Game window found, update status if changed
-                        if self.window_status_var.get() != get_text("process_and_window_found", process_name,
-                                                                    game_title):
-                            self.window_status_var.set(get_text("process_and_window_found", process_name, game_title))
-                            self.window_status_indicator.config(foreground="green")
-                            self.log(get_text("game_process_and_window_found_log", process_name, pid, game_title))
-
-                        # Capture game window
-                        screenshot = capture_window()
-                    else:
-                        # Game process running but window not found
-                        if self.window_status_var.get() != get_text("process_found_no_window", process_name):
-                            self.window_status_var.set(get_text("process_found_no_window", process_name))
-                            self.window_status_indicator.config(foreground="orange")
-                            self.log(get_text("game_process_found_no_window_log", process_name, pid))
-
-                        # Fallback to full screen
-                        screenshot = capture_full_screen()
-                else:
-                    # Game not running
-                    if self.window_status_var.get() != get_text("process_not_found", GAME_PROCESS_NAME):
-                        self.window_status_var.set(get_text("process_not_found", GAME_PROCESS_NAME))
-                        self.window_status_indicator.config(foreground="red")
-                        self.log(get_text("game_process_not_found_log", GAME_PROCESS_NAME))
-
-                    # Fallback to full screen
-                    screenshot = capture_full_screen()
-
-                # Skip if screenshot capture failed
-                if screenshot is None:
-                    time.sleep(CHECK_INTERVAL)
-                    continue
-
-                # Preprocess image
-                processed = preprocess_image(screenshot)
-
-                # Extract text
-                text = extract_text(processed)
-
-                # Debug: save screenshots and text if enabled
-                if self.save_screenshot_var.get():
-                    save_debug_images(screenshot, processed, text)
-
-                # Analyze queue status
-                in_queue, position, total = analyze_queue_status(text)
-
-                # Update state variables
-                self.last_position = position
-                self.last_total = total
-
-                # Logic for detecting game entry
-                if was_in_queue and not in_queue:
-                    # If we were in queue but now we're not - possibly entered the game
-                    self.in_game_detected = True
-                    send_notification()
-                    self.status_var.set(get_text("entered_server"))
-                    self.log(get_text("entered_server"))
-
-                was_in_queue = in_queue
-
-                # Update status in interface
-                if in_queue:
-                    if position is not None and total is not None:
-                        self.status_var.set(get_text("in_queue", position, total))
-                        self.log(get_text("in_queue", position, total))
-                    else:
-                        self.status_var.set(get_text("queue_pos_unknown"))
-                        self.log(get_text("queue_pos_unknown"))
-                elif self.status_var.get() != get_text("entered_server") and not self.save_screenshot_var.get():
-                    self.status_var.set(get_text("running"))
+    def apply_engine_event(self, event):
+        """
+        Show a monitoring engine event in the interface (Tk thread)
+        """
+        kind = event["event"]
+        if kind == EVENT_GAME:
+            from screen_capture import GameLocation
+            self.show_game_location(GameLocation(event["process_name"], event["pid"], event["hwnd"], event["title"]))
+        elif kind == EVENT_STATUS:
+            if event["target"] is None:
+                self.show_queue_status(event)
+            else:
+                self.show_target_status(event)
+        elif kind == EVENT_ENTERED and event["target"] is None:
+            self.status_var.set(get_text("entered_server"))
+            self.log(get_text("entered_server"))
+        elif kind == EVENT_ENTERED:
+            self.log(f"{event['label']}: {get_text('entered_server')}")
+            self.set_target_row(event["target"], event["label"], get_text("entered_server"))
+        elif kind == EVENT_TARGET_ADDED:
+            self.log(get_text("target_added", event["label"], event["title"] or "-"))
+            self.set_target_row(event["target"], event["label"], get_text("running"))
+        elif kind == EVENT_TARGET_REMOVED:
+            self.log(get_text("target_removed", event["label"]))
+            self.target_status.pop(event["target"], None)
+            if self.targets_table is not None and self.targets_table.exists(str(event["target"])):
+                self.targets_table.delete(str(event["target"]))
+        elif kind == EVENT_ERROR:
+            self.log(f"Error in main loop: {event['message']}")
+            self.status_var.set(f"Error: {event['message']}")
+
+    def format_queue_status(self, event):
+        """
+        Status text for a queue state event: queue position with the ETA when it is known
+        """
+        state = event["state"]
+        if state == STATE_QUEUED:
+            if event["position"] is None or event["total"] is None:
+                return get_text("queue_pos_unknown")
+            status = get_text("in_queue", event["position"], event["total"])
+            if event["eta_minutes"] is not None:
+                status += f" ({get_text('eta_minutes', event['eta_minutes'])})"
+            return status
+        if state == STATE_LOADING or state == STATE_IN_GAME:
+            # Keep showing the entry until back in a queue
+            return get_text("entered_server")
+        return get_text("running")
+
+    def show_queue_status(self, event):
+        """
+        Update the status line on a queue state change (the engine only reports changes)
+        """
+        if not self.running:
+            return
 
-            except Exception as e:
-                self.log(f"Error in main loop: {e}")
-                self.status_var.set(f"Error: {str(e)}")
+        self.queue_status = event
+        status = self.format_queue_status(event)
+        self.status_var.set(status)
+        # Entering the server is logged by its own event
+        if event["state"] == STATE_QUEUED:
+            self.log(status)
 
-            # Pause before next check
-            time.sleep(CHECK_INTERVAL)
+    def show_target_status(self, event):
+        """
+        Update the row of one game client on a queue state change (multi-target mode)
+        """
+        status = self.format_queue_status(event)
+        if event["state"] == STATE_QUEUED:
+            self.log(f"{event['label']}: {status}")
+        self.set_target_row(event["target"], event["label"], status)
+
+    def set_target_row(self, key, label, status):
+        """
+        Show the status of a game client in the targets table
+        """
+        self.target_status[key] = status
+        if self.targets_table is None or not self.running:
+            return
+        item = str(key)
+        if self.targets_table.exists(item):
+            self.targets_table.item(item, values=(label, status))
+        else:
+            self.targets_table.insert("", tk.END, iid=item, values=(label, status))
 
     def save_settings(self):
         """
@@ -860,6 +1117,9 @@ class SquadQueueMonitorUI:
             # Update game process name
             GAME_PROCESS_NAME = self.process_name_entry.get().strip()
 
+            # Update adaptive polling bounds and the game process the engine looks for
+            self.apply_engine_settings()
+
             # Update game window title (fallback)
             GAME_WINDOW_TITLE = self.window_title_entry.get().strip()
 
@@ -870,7 +1130,11 @@ class SquadQueueMonitorUI:
             indicators_text = self.ingame_indicators_entry.get("1.0", tk.END).strip()
             IN_GAME_INDICATORS = [ind.strip() for ind in indicators_text.split(",") if ind.strip()]
 
+            # Recompile the queue text matcher (only done when settings change)
+            configure_queue_matcher(QUEUE_TEXT_PATTERN, IN_GAME_INDICATORS)
+
             # Test pattern with example
+            from ocr_processor import test_regex
             example_text = "Position: 1 / 1"  # Fixed English example for queue detection
             success, pos, total = test_regex(QUEUE_TEXT_PATTERN, example_text)
 
@@ -884,43 +1148,96 @@ class SquadQueueMonitorUI:
         except re.error as e:
             messagebox.showerror("Regular Expression Error", get_text("regex_error", str(e)))
 
+    def apply_engine_settings(self):
+        """
+        Pass the polling bounds and game process name from the settings to the engine
+        (once loaded - on_engine_loaded calls this again); raises ValueError for invalid numbers
+        """
+        min_interval = float(self.min_interval_entry.get())
+        max_interval = float(self.max_interval_entry.get())
+        if self.engine is None:
+            return
+        self.poll_scheduler.set_bounds(CHECK_INTERVAL, min_interval, max_interval)
+        self.game_locator.set_process_name(GAME_PROCESS_NAME)
+
     def test_capture(self):
         """
         Test screen capture and text recognition
         """
-        # Try to capture game window first
-        from screen_capture import is_game_running, find_game_window, capture_window, capture_full_screen
+        self.test_ocr_button.config(state=tk.DISABLED)
+        self.test_button.config(state=tk.DISABLED)
 
-        is_running, process_name, pid = is_game_running()
+        # Capture and OCR run in a background thread
+        self.run_in_background(self.run_test_capture, self.show_test_capture_result)
 
-        if is_running:
-            game_hwnd, game_title = find_game_window()
-            if game_hwnd:
-                self.log(f"Capturing game window: {game_title}")
-                screenshot = capture_window()
+    def run_test_capture(self):
+        """
+        Capture, recognize and save test files (runs in a background thread)
+        Returns: (log message, queue status) or None if capture failed
+        """
+        # The capture backend is part of the engine, loaded in the background at startup
+        if not self.engine_ready.wait(ENGINE_LOAD_TIMEOUT):
+            return None
+        if self.engine is None:
+            raise RuntimeError(f"Monitoring engine not loaded: {self.engine_error}")
+
+        import cv2
+        from screen_capture import preprocess_image
+        from ocr_processor import extract_text, analyze_queue_status
+
+        # Try to capture game window first
+        location = self.game_locator.locate()
+
+        if self.capture_backend.name == "replay":
+            message = f"Replaying frames from {self.capture_backend.source}"
+        elif location.pid is not None:
+            if location.hwnd:
+                message = f"Capturing game window: {location.title}"
             else:
-                self.log("Game process running but window not found, using full screen")
-                screenshot = capture_full_screen()
+                message = "Game process running but window not found, using full screen"
         else:
-            self.log(f"Game process {GAME_PROCESS_NAME} not running, using full screen")
-            screenshot = capture_full_screen()
+            message = f"Game process {GAME_PROCESS_NAME} not running, using full screen"
 
-        if screenshot is None:
-            messagebox.showerror("Error", get_text("capture_error"))
-            return
+        screenshot = self.capture_backend.capture(GAME_WINDOW_TITLE)
 
-        # Process and analyze
-        processed = preprocess_image(screenshot)
-        text = extract_text(processed)
+        if screenshot is None:
+            return message, None
 
-        # Save files for inspection
-        cv2.imwrite("test_capture.png", screenshot)
-        cv2.imwrite("test_processed.png", processed)
+        try:
+            # Process and analyze
+            processed = preprocess_image(screenshot)
+            text = extract_text(processed)
+
+            # Save files for inspection
+            cv2.imwrite("test_capture.png", screenshot)
+            cv2.imwrite("test_processed.png", processed)
+        finally:
+            self.capture_backend.release(screenshot)
         with open("test_text.txt", "w", encoding="utf-8") as f:
             f.write(text)
 
         # Analyze queue status
-        in_queue, position, total = analyze_queue_status(text)
+        return message, analyze_queue_status(text)
+
+    def show_test_capture_result(self, outcome):
+        """
+        Show test capture result on the Tk thread
+        """
+        self.test_ocr_button.config(state=tk.NORMAL)
+        self.test_button.config(state=tk.NORMAL)
+
+        if isinstance(outcome, Exception):
+            self.log(f"Error in test capture: {outcome}")
+            messagebox.showerror("Error", get_text("capture_error"))
+            return
+
+        message, status = outcome
+        self.log(message)
+        if status is None:
+            messagebox.showerror("Error", get_text("capture_error"))
+            return
+
+        in_queue, position, total = status
         result = get_text("test_result")
 
         if in_queue:
@@ -939,6 +1256,7 @@ class SquadQueueMonitorUI:
                     os.startfile(file)
                 except:
                     # Fallback to webbrowser for non-Windows systems
+                    import webbrowser
                     webbrowser.open(os.path.abspath(file))
 
     def test_regex(self):
@@ -948,6 +1266,7 @@ class SquadQueueMonitorUI:
         pattern = self.queue_pattern_entry.get()
         example = "Position: 1 / 1"  # Fixed English example
 
+        from ocr_processor import test_regex
         success, pos, total = test_regex(pattern, example)
         if success:
             self.log(get_text("test_regex_result", pos, total))
@@ -960,30 +1279,82 @@ class SquadQueueMonitorUI:
         """
         Enable/disable saving screenshots for debugging
         """
+        if self.engine is not None:
+            # Otherwise applied when the engine is loaded
+            self.engine.save_screenshots = self.save_screenshot_var.get()
+            if not self.engine.save_screenshots:
+                self.engine.debug_recorder.clear()
         if self.save_screenshot_var.get():
             messagebox.showinfo("Debug", get_text("debug_enabled"))
         else:
             messagebox.showinfo("Debug", get_text("debug_disabled"))
 
-    def update_screen_resolution_info(self):
+    def update_debug_stats(self, _=None):
+        """
+        Refresh the frame skip and OCR cascade statistics in the debug tab
+        """
+        self.update_skip_ratio_info()
+        self.update_cascade_stats_info()
+
+    def update_skip_ratio_info(self):
+        """
+        Update the share of frames that skipped OCR in the debug tab
+        """
+        if self.change_detector is None:
+            return
+        total, unchanged, black = self.change_detector.get_stats()
+        ratio = round(self.change_detector.skip_ratio() * 100, 1)
+        self.skip_ratio_var.set(get_text("skip_ratio", ratio, total, unchanged, black))
+
+    def update_stage_metrics_table(self):
         """
-        Update screen resolution information
+        Refresh the stage latency table and frame statistics once a second while the debug tab is shown
         """
-        screen_width, screen_height = pyautogui.size()
-        self.resolution_var.set(get_text("resolution", screen_width, screen_height))
+        if self.tab_control.select() == str(self.debug_tab):
+            self.update_debug_stats()
+            rows = self.stage_metrics.get_summary()
+            existing = set(self.stage_metrics_table.get_children())
+            for stage, last, mean, p95, maximum in rows:
+                values = (stage, f"{last:.1f}", f"{mean:.1f}", f"{p95:.1f}", f"{maximum:.1f}")
+                if stage in existing:
+                    self.stage_metrics_table.item(stage, values=values)
+                else:
+                    self.stage_metrics_table.insert("", tk.END, iid=stage, values=values)
+            # Stages that are gone after a reset
+            for stage in existing - {row[0] for row in rows}:
+                self.stage_metrics_table.delete(stage)
 
-        # Update every 5 seconds
-        self.root.after(5000, self.update_screen_resolution_info)
+        self.root.after(1000, self.update_stage_metrics_table)
+
+    def update_cascade_stats_info(self):
+        """
+        Update OCR cascade per-stage statistics in the debug tab
+        """
+        if self.ocr_cascade is None:
+            return
+        lines = [
+            f"{name:20s} {runs:6d} runs  {hit_rate * 100:5.1f}% hit  {mean_ms:8.1f} ms avg  {last_ms:8.1f} ms last"
+            for name, runs, hit_rate, mean_ms, last_ms in self.ocr_cascade.get_stats()
+        ]
+        self.cascade_stats_var.set(get_text("cascade_stats", "\n" + "\n".join(lines)))
 
     def log(self, message):
         """
-        Add message to the log
+        Add message to the log (from another thread the message is posted to the Tk thread)
         """
+        if threading.current_thread() is not threading.main_thread():
+            self.ui_bus.post(self.log, message)
+            return
+
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         log_message = f"[{timestamp}] {message}"
 
-        self.log_text.insert(tk.END, log_message + "\n")
-        self.log_text.see(tk.END)  # Scroll to end
+        self.log_buffer.add(timestamp, message)
+        if self.file_logger is not None:
+            self.file_logger.info(message)
+
+        # Redraw the visible log lines once per batch of messages
+        self.ui_bus.post(self.log_view.refresh, key="log_view")
 
         # Also print to console
         print(log_message)
\ No newline at end of file
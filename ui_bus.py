@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class UiUpdateBus:
+    """
+    Thread-safe queue of UI updates that the Tk thread applies in batches. An update posted
+    with a key replaces the pending update with the same key, so when several status changes
+    arrive between two drains only the newest one is drawn.
+    """
+
+    def __init__(self, metrics=None, stage="ui_update"):
+        self.metrics = metrics
+        self.stage = stage
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()
+        self.sequence = 0
+        self.posted = 0
+        self.coalesced = 0
+
+    def post(self, callback, payload=None, key=None):
+        """
+        Queue callback(payload) to run on the Tk thread (safe to call from any thread)
+        key: updates with the same key supersede each other; None - always applied
+        """
+        with self.lock:
+            self.posted += 1
+            if key is None:
+                # Unique key - never coalesced
+                self.sequence += 1
+                key = (None, self.sequence)
+            elif self.pending.pop(key, None) is not None:
+                self.coalesced += 1
+            self.pending[key] = (callback, payload, time.perf_counter())
+
+    def drain(self):
+        """
+        Apply all pending updates in posting order (Tk thread only)
+        Returns: post times of the applied updates, for record_latency
+        """
+        with self.lock:
+            if not self.pending:
+                return []
+            batch = list(self.pending.values())
+            self.pending.clear()
+
+        for callback, payload, _ in batch:
+            try:
+                callback(payload)
+            except Exception as e:
+                print(f"Error applying UI update: {e}")
+        return [posted_at for _, _, posted_at in batch]
+
+    def record_latency(self, posted_times):
+        """
+        Record time from posting to now for each update - call once the changes are painted
+        """
+        if self.metrics is None:
+            return
+        now = time.perf_counter()
+        for posted_at in posted_times:
+            self.metrics.record(self.stage, (now - posted_at) * 1000)
+
+    def get_stats(self):
+        """
+        Returns: (posted, coalesced, pending)
+        """
+        with self.lock:
+            return self.posted, self.coalesced, len(self.pending)